@@ -0,0 +1,115 @@
+import math
+from statistics import NormalDist
+
+# ==========================================
+# 적응형 샘플링 (조기 종료 + 불확실 구간 촘촘히)
+# ==========================================
+# 처음에는 성기게(예: 1초 간격) 순서대로 점수를 매기면서, 지금까지의 AI 프레임 비율이
+# 판정 기준(decision_rate)보다 확실히 높거나 낮은지 순차 검정으로 확인하고 결정되면 바로 멈춥니다.
+# 영상 끝까지 봐도 결정되지 않으면 판정이 엇갈리거나 점수가 기준값 근처인 구간 안의 프레임만
+# 한 번 더 (한 번의 디코딩으로) 추가 분석합니다.
+#
+# 여러 번 중간 확인을 하므로, k번째 확인에서는 유의수준을 alpha * 6 / (pi^2 * k^2)로 나눠 써서
+# 전체 오류율이 alpha를 넘지 않도록 합니다. (프레임끼리 독립이 아니므로 근사적인 기준)
+
+ADAPTIVE_STRIDE = 30        # 첫 단계 샘플 간격(프레임)
+ADAPTIVE_CONFIDENCE = 0.95  # 이 신뢰도에 도달하면 판정 후 종료
+DECISION_RATE = 0.5         # AI 프레임 비율이 이보다 높으면 "fake", 낮으면 "real"
+MIN_SAMPLES = 8             # 최소 샘플 수 (이보다 적으면 판정하지 않음)
+LOOK_EVERY = 8              # 몇 샘플마다 검정할지
+MAX_FRAMES = 200            # 분석할 최대 샘플 수
+REFINE_SPLITS = 3           # 불확실 구간마다 추가로 볼 프레임 수 (구간을 균등하게 나눔)
+UNCERTAIN_MARGIN = 0.15     # 점수가 threshold ± margin 안이면 불확실한 샘플
+MIN_GAP = 2                 # 이보다 가까운 두 샘플 사이는 더 나누지 않음
+
+_NORMAL = NormalDist()
+
+
+def sample_weights(indices):
+    """
+    정렬된 프레임 번호마다 그 샘플이 대표하는 구간 길이(이웃 샘플과의 중간점까지)를 가중치로 줍니다.
+    간격이 일정하면 모두 같은 가중치가 되고, 촘촘히 추가한 구간의 샘플은 가중치가 작아집니다.
+    """
+    n = len(indices)
+    if n == 0:
+        return []
+    if n == 1:
+        return [1.0]
+    weights = []
+    for k, index in enumerate(indices):
+        left = (index - indices[k - 1]) / 2 if k > 0 else (indices[1] - indices[0]) / 2
+        right = (indices[k + 1] - index) / 2 if k < n - 1 else (indices[-1] - indices[-2]) / 2
+        weights.append(max(left + right, 1e-9))
+    return weights
+
+
+def weighted_rate(samples, threshold):
+    """
+    samples: {frame_index: score}
+    Returns: (가중 AI 프레임 비율, 유효 표본 수)
+    """
+    indices = sorted(samples)
+    weights = sample_weights(indices)
+    total = sum(weights)
+    if total <= 0:
+        return 0.0, 0.0
+    fake = sum(w for i, w in zip(indices, weights) if samples[i] > threshold)
+    n_eff = total ** 2 / sum(w * w for w in weights)
+    return fake / total, n_eff
+
+
+def sequential_test(samples, threshold, look, decision_rate=DECISION_RATE, confidence=ADAPTIVE_CONFIDENCE,
+                    min_samples=MIN_SAMPLES):
+    """
+    지금까지의 점수로 판정이 났는지 확인합니다.
+
+    Parameters:
+    - samples: {frame_index: score}
+    - look: 몇 번째 중간 확인인지 (1부터)
+
+    Returns:
+    - {"decision": "fake" | "real" | None, "rate", "confidence", "samples"}
+      confidence는 decision_rate 쪽이 아니라고 말할 수 있는 신뢰도 (중간 확인 횟수 보정 후)
+    """
+    rate, n_eff = weighted_rate(samples, threshold)
+    d = min(max(decision_rate, 1e-6), 1 - 1e-6)
+    if n_eff <= 0:
+        reached = 0.0
+    else:
+        z = abs(rate - d) / math.sqrt(d * (1 - d) / n_eff)
+        p_value = 1 - _NORMAL.cdf(z)
+        reached = 1 - min(1.0, p_value * math.pi ** 2 * max(look, 1) ** 2 / 6)
+
+    decision = None
+    if len(samples) >= min_samples and reached >= confidence and rate != d:
+        decision = "fake" if rate > d else "real"
+    return {"decision": decision, "rate": rate, "confidence": reached, "samples": len(samples)}
+
+
+def plan_refinement(samples, threshold, margin=UNCERTAIN_MARGIN, min_gap=MIN_GAP, limit=None, exclude=(),
+                    splits=REFINE_SPLITS):
+    """
+    판정이 엇갈리거나 기준값 근처 점수가 있는 이웃 샘플 쌍 사이를 splits+1등분하는 프레임 번호를 고릅니다.
+    판정이 엇갈린 구간, 기준값에 가까운(더 불확실한) 구간 순서로 limit개까지 반환합니다.
+    exclude: 이미 시도한 프레임 번호 (다시 고르지 않음)
+    """
+    indices = sorted(samples)
+    candidates = []
+    for a, b in zip(indices, indices[1:]):
+        if b - a < min_gap:
+            continue
+        sa, sb = samples[a], samples[b]
+        disagree = (sa > threshold) != (sb > threshold)
+        near = min(abs(sa - threshold), abs(sb - threshold))
+        if disagree or near < margin:
+            points = sorted({a + (b - a) * k // (splits + 1) for k in range(1, splits + 1)} - {a, b})
+            # 한 구간의 점수는 가운데부터 (예산이 모자라면 중간 프레임이 먼저 뽑히도록)
+            points.sort(key=lambda i: abs(2 * i - a - b))
+            for rank, point in enumerate(points):
+                if point not in samples and point not in exclude:
+                    candidates.append((rank, 0 if disagree else 1, near, point))
+    candidates.sort()
+    picked = [point for *_, point in candidates]
+    if limit is not None:
+        picked = picked[:max(limit, 0)]
+    return sorted(picked)
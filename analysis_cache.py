@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import unicodedata
+from typing import get_args, get_origin
+
+from typing_extensions import get_type_hints, is_typeddict
+
+from cache_store import TieredCache
+from gemini_main import GEMINI_MODEL, USE_JSON_OUTPUT, AdAnalysisResult, PROMPT_5, PROMPT_6
+
+# ==========================================
+# Gemini 분석 결과 캐시
+# ==========================================
+# 같은 광고 스크립트가 하루에도 수백 번 들어오므로 (정규화된 스크립트, 프롬프트, 모델,
+# 출력 스키마)의 해시를 키로 파싱된 AdAnalysisResult JSON을 보관합니다.
+
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 60 * 60)))  # 초
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))  # 메모리 항목 수
+ANALYSIS_CACHE_DISK_SIZE = int(os.getenv("ANALYSIS_CACHE_DISK_SIZE", "5000"))
+ANALYSIS_CACHE_DB = os.getenv("ANALYSIS_CACHE_DB", "analysis_cache.sqlite3")  # 빈 문자열이면 디스크 캐시 사용 안 함
+
+# 요청 바디의 "cache" 옵션
+CACHE_USE = "use"          # 캐시가 있으면 사용 (기본값)
+CACHE_BYPASS = "bypass"    # 캐시를 읽지도 쓰지도 않음
+CACHE_REFRESH = "refresh"  # 캐시를 무시하고 새로 분석한 뒤 덮어씀
+CACHE_MODES = (CACHE_USE, CACHE_BYPASS, CACHE_REFRESH)
+
+
+def normalize_script(script):
+    """유니코드 정규화(NFC) + 공백 정리로 표기만 다른 같은 스크립트를 하나의 키로 묶습니다."""
+    return " ".join(unicodedata.normalize("NFC", script or "").split())
+
+
+def _describe_type(tp):
+    """중첩된 TypedDict까지 펼쳐서 스키마 정의를 비교 가능한 형태로 만듭니다."""
+    if is_typeddict(tp):
+        return {name: _describe_type(t) for name, t in get_type_hints(tp).items()}
+    args = get_args(tp)
+    if args:
+        return [repr(get_origin(tp)), [_describe_type(a) for a in args]]
+    return repr(tp)
+
+
+def _schema_fingerprint():
+    # USE_JSON_OUTPUT 여부와 응답 스키마 정의가 바뀌면 이전 결과를 쓰지 않도록 키에 포함
+    if not USE_JSON_OUTPUT:
+        return "text"
+    return _describe_type(AdAnalysisResult)
+
+
+def make_analysis_key(prompt, script):
+    target_prompt = PROMPT_6 if USE_JSON_OUTPUT else PROMPT_5
+    raw = json.dumps(
+        {
+            "script": normalize_script(script),
+            "prompt": prompt or "",
+            "target_prompt": target_prompt,
+            "model": GEMINI_MODEL,
+            "schema": _schema_fingerprint(),
+        },
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+analysis_cache = TieredCache(
+    ANALYSIS_CACHE_DB, "analysis_results", ANALYSIS_CACHE_TTL, ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_DISK_SIZE
+)
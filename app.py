@@ -1,6 +1,8 @@
 from flask import Flask, jsonify
+from serialization import OrjsonProvider
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 @app.route('/')
 def home():
@@ -9,14 +11,16 @@ def home():
         "message": "Hello, World! Flask server is running."
     })
 ###############영상 다운->AI 분석->통합추출###############
-from yt_shorts import get_video_id, collect_and_split_data, get_or_save_api_key
-import cv2
+from yt_shorts import (get_video_id, collect_and_split_data, get_or_save_api_key, find_video_file,
+                       DOWNLOAD_MODE, DOWNLOAD_PROFILE)
 import mediapipe as mp
 import os
 import json
 from flask import Flask, jsonify, request
 from models.npr_model.npr_wrapper import NPRDetector
-import imageio
+from npr_engine import NPRVideoAnalyzer, parse_options
+from job_queue import JobQueue, JobStore, JOB_DB_PATH
+from serialization import write_json, dumps, loads
 
 # ==========================================
 # 1. 전역 설정 및 모델 로드
@@ -27,16 +31,7 @@ face_detection = mp_face_detection.FaceDetection(
     model_selection=1,    
     min_detection_confidence=0.5
 )
-
-def make_json_safe(obj):
-    """JSON 저장 시 에러 방지를 위한 변환 함수"""
-    if isinstance(obj, dict):
-        return {str(k): make_json_safe(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple, set)):
-        return [make_json_safe(v) for v in obj]
-    if isinstance(obj, (str, int, float, bool)) or obj is None:
-        return obj
-    return str(obj)
+npr_analyzer = NPRVideoAnalyzer(npr_detector, face_detection)
 
 # ==========================================
 # 2. [현석] AI 분석 전용 라우트 (분리된 Step 3)
@@ -49,66 +44,18 @@ def analyze_npr():
     if not video_path or not os.path.exists(video_path):
         return jsonify({"status": "error", "message": "파일을 찾을 수 없습니다."}), 400
 
+    # 옵션: sample_strategy("stride"/"fps"/"keyframe"/"adaptive"/"shot"), sample_stride, sample_fps, batch_size, threshold,
+    #       save_frames("none"/"full"/"face"/"thumbnail"), thumbnail_size, face_detect_interval, detect_max_side,
+    #       face_mode("primary"/"all"), min_face_confidence, min_face_size, no_face_fallback("frame"/"skip"),
+    #       adaptive_stride, adaptive_confidence, decision_rate, adaptive_max_frames (adaptive 전용),
+    #       scene_cut_threshold, shot_samples, shot_sample_gap, shot_max_gap (shot 전용)
     try:
-        cap = cv2.VideoCapture(video_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fake_frame_count = 0
-        analyzed_count = 0
-
-        print(f"분석 시작: {video_path} (총 {total_frames} 프레임)")
-
-        # 프레임 저장 폴더
-        base_dir = os.path.dirname(video_path)
-        ai_dir = os.path.join(base_dir, "frames_ai")
-        real_dir = os.path.join(base_dir, "frames_real")
-
-        os.makedirs(ai_dir, exist_ok=True)
-        os.makedirs(real_dir, exist_ok=True)
-
-
-        for i in range(0, total_frames, 10):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-            success, frame = cap.read()
-            if not success:
-                break
-
-            analyzed_count += 1
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            face_results = face_detection.process(frame_rgb)
-
-            score = 0
-            if face_results.detections:
-                det = face_results.detections[0]
-                bbox = det.location_data.relative_bounding_box
-                ih, iw, _ = frame.shape
-                x = int(bbox.xmin * iw)
-                y = int(bbox.ymin * ih)
-                w = int(bbox.width * iw)
-                h = int(bbox.height * ih)
-                face_img = frame[max(0, y):y+h, max(0, x):x+w]
-
-                if face_img.size > 0:
-                    score = npr_detector.predict_image(face_img)
-            else:
-                score = npr_detector.predict_image(frame)
-
-        frame_name = f"frame_{i:06d}.jpg"
-
-        if score > 0.5:
-            fake_frame_count += 1
-            cv2.imwrite(os.path.join(ai_dir, frame_name), frame)
-        else:
-            cv2.imwrite(os.path.join(real_dir, frame_name), frame)
-        
-        cap.release()
-        ai_rate = (fake_frame_count / analyzed_count) * 100 if analyzed_count > 0 else 0
-        
-        analysis_results = {
-            "ai_detected_frames": fake_frame_count,
-            "ai_generation_rate": f"{round(ai_rate, 2)}%",
-            "analyzed_frames": analyzed_count
-        }
+        options = parse_options(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "error", "message": f"잘못된 분석 옵션입니다: {e}"}), 400
 
+    try:
+        analysis_results = npr_analyzer.analyze(video_path, options)
         return jsonify({
             "status": "success",
             "analysis_results": analysis_results
@@ -118,8 +65,87 @@ def analyze_npr():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # ==========================================
-# 3. [순호+통합] 데이터 추출 엔드포인트
+# 3. [순호+통합] 데이터 추출 엔드포인트 (백그라운드 작업)
 # ==========================================
+EXTRACT_STAGES = ["collect", "npr_analysis", "integrate"]
+# 같은 영상의 진행 중인 작업을 재사용할 때 일치해야 하는 옵션 (url은 형식만 다를 수 있어 제외)
+EXTRACT_DEDUPE_FIELDS = ("refresh", "download_mode", "download_profile", "npr_options")
+
+def run_extract_pipeline(payload, ctx):
+    """/extract 작업 핸들러: 수집/다운로드 -> NPR 분석 -> 통합 저장"""
+    url = payload["url"]
+    v_id = payload["video_id"]
+    api_key = get_or_save_api_key()
+
+    # --- [STEP 1] 데이터 수집 및 영상 다운로드 ---
+    ctx.start_stage("collect")
+    result = collect_and_split_data(api_key, url, v_id, refresh=payload.get("refresh", False),
+                                    download_mode=payload.get("download_mode"),
+                                    download_profile=payload.get("download_profile"))
+
+    if isinstance(result, str):
+        storage_path = result
+    elif isinstance(result, dict):
+        storage_path = result.get("storage_path")
+    else:
+        raise TypeError(f"결과 타입 이상: {type(result)}")
+
+    # --- [STEP 2] 영상 경로 확보 ---
+    # 재인코딩 없이 받은 경우 mp4가 아닐 수 있으므로 컨테이너와 무관하게 찾음
+    video_path = os.path.join(storage_path, "video.mp4")
+    if not os.path.exists(video_path):
+        video_name = find_video_file(storage_path)
+        if video_name:
+            video_path = os.path.join(storage_path, video_name)
+    ctx.finish_stage("collect", {"storage_path": storage_path, "video_path": video_path})
+
+    print(f"📍 분석 실행 경로: {video_path}")
+
+    # --- [STEP 3] AI 분석 (분석 엔진 직접 호출) ---
+    ctx.start_stage("npr_analysis")
+    npr_analysis = {}
+    if video_path and os.path.exists(video_path):
+        try:
+            npr_analysis = npr_analyzer.analyze(video_path, parse_options(payload.get("npr_options")))
+        except Exception as e:
+            npr_analysis = {"error": "AI 분석 실패", "detail": str(e)}
+    else:
+        npr_analysis = {"message": "영상 파일을 찾을 수 없어 분석을 건너뛰었습니다."}
+    ctx.finish_stage("npr_analysis", npr_analysis)
+
+    # --- [STEP 4] 데이터 통합 및 최종 저장 ---
+    ctx.start_stage("integrate")
+    # 수집 단계에서 메모리에 들고 있는 값을 그대로 사용 (data_api_origin.json 재읽기 생략)
+    api_data = result.get("api_data", {}) if isinstance(result, dict) else {}
+    metadata = result.get("metadata", {}) if isinstance(result, dict) else {}
+
+    final_integrated_data = {
+        "video_id": v_id,
+        "storage_path": storage_path,
+        "video_path": video_path,
+        "api_data": api_data,
+        "metadata": metadata,
+        "ai_analysis": npr_analysis,
+        "thumbnail_path": os.path.join(storage_path, "thumbnail.jpg")
+    }
+
+    # 통합 JSON 저장 (numpy 값 등은 serialization 모듈에서 변환)
+    integrated_json_path = os.path.join(storage_path, "data_api_integrated.json")
+    write_json(integrated_json_path, final_integrated_data, pretty=True)
+    # AI 리포트는 통합 JSON(ai_analysis)에만 기록하고 원본 API JSON은 다시 쓰지 않음
+    ctx.finish_stage("integrate", {"integrated_json_path": integrated_json_path})
+
+    return final_integrated_data
+
+job_queue = JobQueue(JobStore(JOB_DB_PATH), max_workers=int(os.getenv("EXTRACT_WORKERS", "2")))
+job_queue.register("extract", run_extract_pipeline, EXTRACT_STAGES)
+
+@app.before_request
+def resume_pending_jobs():
+    # 재시작 전에 끝나지 않은 작업을 첫 요청 시점에 한 번만 다시 실행
+    # (debug 리로더의 부모 프로세스에서 작업이 중복 실행되지 않도록 import 시점이 아닌 요청 시점에 처리)
+    job_queue.resume()
+
 @app.route('/extract', methods=['POST'])
 def extract_video_data():
     data = request.get_json(silent=True)
@@ -127,87 +153,55 @@ def extract_video_data():
         return jsonify({"status": "error", "message": "요청 바디에 'url'이 없습니다."}), 400
 
     url = data.get('url')
-    api_key = get_or_save_api_key()
     v_id = get_video_id(url)
 
     if not v_id:
         return jsonify({"status": "error", "message": "유효하지 않은 URL입니다."}), 400
 
+    # 분석 옵션은 등록 전에 검사 (/analyze/npr 과 같이 잘못된 옵션은 400)
     try:
-        # --- [STEP 1] 데이터 수집 및 영상 다운로드 ---
-        result = collect_and_split_data(api_key, url, v_id)
-        print("DEBUG result:", result)
-
-        if isinstance(result, str):
-            storage_path = result
-        elif isinstance(result, dict):
-            storage_path = result.get("storage_path")
-        else:
-            raise TypeError(f"결과 타입 이상: {type(result)}")
-
-        # --- [STEP 2] 영상 경로 확보 ---
-        video_path = os.path.join(storage_path, "video.mp4")
-        if not os.path.exists(video_path):
-            for f in os.listdir(storage_path):
-                if f.startswith("video") and f.endswith((".mp4", ".webm", ".mkv", ".mov", ".avi")):
-                    video_path = os.path.join(storage_path, f)
-                    break
-        
-        print(f"📍 분석 실행 경로: {video_path}")
-
-        # --- [STEP 3] AI 분석 호출 (내부 라우트 호출 형식) ---
-        npr_analysis = {}
-        if video_path and os.path.exists(video_path):
-            # Flask 내부 test_client를 사용하여 다른 라우트 호출
-            with app.test_client() as client:
-                npr_response = client.post('/analyze/npr', json={"video_path": video_path})
-                npr_data = npr_response.get_json() or {}
-                
-                if npr_data.get("status") == "success":
-                    npr_analysis = npr_data.get("analysis_results", {})
-                else:
-                    npr_analysis = {"error": "AI 분석 라우트 호출 실패", "detail": npr_data}
-        else:
-            npr_analysis = {"message": "영상 파일을 찾을 수 없어 분석을 건너뛰었습니다."}
-
-        # --- [STEP 4] 데이터 통합 및 최종 저장 ---
-        api_data = {}
-        api_json_file = os.path.join(storage_path, "data_api_origin.json")
-        if os.path.exists(api_json_file):
-            with open(api_json_file, "r", encoding="utf-8") as f:
-                api_data = json.load(f)
-
-        final_integrated_data = {
-            "video_id": v_id,
-            "storage_path": storage_path,
-            "video_path": video_path,
-            "api_data": api_data,
-            "ai_analysis": npr_analysis,
-            "thumbnail_path": os.path.join(storage_path, "thumbnail.jpg")
-        }
-        
-        final_integrated_data = make_json_safe(final_integrated_data)
-
-        # 통합 JSON 저장
-        integrated_json_path = os.path.join(storage_path, "data_api_integrated.json")
-        with open(integrated_json_path, 'w', encoding='utf-8') as f:
-            json.dump(final_integrated_data, f, indent=4, ensure_ascii=False, default=str)
-
-        # 원본 JSON에 리포트 추가
-        if os.path.exists(api_json_file):
-            api_data["ai_analysis_report"] = npr_analysis
-            with open(api_json_file, 'w', encoding='utf-8') as f:
-                json.dump(api_data, f, indent=4, ensure_ascii=False, default=str)
-
-        return jsonify({
-            "status": "success",
-            "message": "수집 및 분석이 모두 완료되었습니다.",
-            "data": final_integrated_data
-        })
-
-    except Exception as e:
-        print(f"❌ 오류 발생: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        npr_options = parse_options(data.get("npr_options"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "error", "message": f"잘못된 분석 옵션입니다: {e}"}), 400
+
+    # refresh=true 이면 이전 산출물을 재사용하지 않고 모두 다시 수집
+    # 중복 비교를 위해 기본값까지 채운 실제 적용 옵션으로 저장
+    payload = {
+        "url": url,
+        "video_id": v_id,
+        "refresh": bool(data.get("refresh", False)),
+        "download_mode": data.get("download_mode") or DOWNLOAD_MODE,  # "direct"(기본) 또는 "transcode"
+        "download_profile": data.get("download_profile") or DOWNLOAD_PROFILE,  # "analysis"(기본) 또는 "full"
+        "npr_options": npr_options,  # /analyze/npr 과 같은 분석 옵션
+    }
+    # 같은 영상의 작업이 이미 대기/실행 중이면 (재시도 등) 새로 실행하지 않고 그 작업을 돌려줌
+    # 한 영상의 Extraction 폴더는 한 작업만 건드려야 하므로, 옵션이 다르면 409로 거절
+    job_id, created = job_queue.submit("extract", payload, dedupe_key=v_id)
+    if not created:
+        active = job_queue.get(job_id)
+        requested = loads(dumps(payload))
+        if active is not None and any(active["payload"].get(k) != requested[k] for k in EXTRACT_DEDUPE_FIELDS):
+            return jsonify({
+                "status": "error",
+                "message": "같은 영상의 작업이 다른 옵션으로 진행 중입니다. 끝난 뒤 다시 요청하세요.",
+                "job_id": job_id,
+                "status_url": f"/jobs/{job_id}"
+            }), 409
+    return jsonify({
+        "status": "accepted",
+        "message": ("작업이 등록되었습니다." if created else "같은 영상의 작업이 이미 진행 중입니다.")
+                   + " /jobs/<job_id> 로 진행 상황을 확인하세요.",
+        "job_id": job_id,
+        "deduplicated": not created,
+        "status_url": f"/jobs/{job_id}"
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    return jsonify({"status": "success", "job": job})
 
 ############# 승언 추가 #############
 # youtube-transcript-api 패키지 설치
@@ -215,9 +209,9 @@ def extract_video_data():
 # pip install youtube-transcript-api 를 터미널에 입력하세요.
 
 import json
-from youtube_transcript_api import YouTubeTranscriptApi
 from flask import Flask, jsonify
 from flask import request
+from transcript_store import get_transcript
 
 # app = Flask(__name__)
 
@@ -248,20 +242,12 @@ def get_youtube_transcript():
     video_id = video_url.split("v=")[-1].split("&")[0]
 
     try:
-        # YouTubeTranscriptApi 인스턴스 생성
-        ytt_api = YouTubeTranscriptApi()
-        
-        # 자막 가져오기
-        if languages:
-            transcript = ytt_api.fetch(video_id, languages=languages)
-        else:
-            # 언어 지정 없이 자동으로 사용 가능한 자막 선택
-            transcript = ytt_api.fetch(video_id)
+        # 자막 가져오기 (캐시 우선, 없으면 YouTubeTranscriptApi 호출)
+        transcript = get_transcript(video_id, languages)["segments"]
         
         # JSON 파일로 저장 (옵션)
         if save_to_json:
-            with open(save_to_json, 'w', encoding='utf-8') as f:
-                json.dump(transcript, f, ensure_ascii=False, indent=4)
+            write_json(save_to_json, transcript, pretty=True)
             print(f"Transcript saved to {save_to_json}")
         
         return jsonify({"status": "success", "transcript": transcript})
@@ -274,20 +260,14 @@ def get_youtube_transcript():
 #     app.run(debug=True)
 
 # 수정 제안 예시
-from youtube_transcript_api.formatters import TextFormatter
-
 def get_youtube_transcript2(video_url, languages=['ko', 'en']):
     from yt_shorts import get_video_id
     video_id = get_video_id(video_url) # 다양한 URL 지원
     if not video_id: return None
 
     try:
-        ytt_api = YouTubeTranscriptApi()
-        transcript = ytt_api.fetch(video_id, languages=languages)
-        
-        # 순수 텍스트로 변환하여 Gemini 분석에 최적화
-        formatter = TextFormatter()
-        return formatter.format_transcript(transcript).strip()
+        # 자막 저장소에 TextFormatter로 변환된 순수 텍스트가 함께 보관됨
+        return get_transcript(video_id, languages)["text"].strip()
     except Exception:
         return None
 
@@ -295,8 +275,40 @@ def get_youtube_transcript2(video_url, languages=['ko', 'en']):
 ############# 도현 추가 #############
 
 from gemini_main import main as gemini_analyze, PROMPT_1
+from analysis_cache import analysis_cache, make_analysis_key, normalize_script, CACHE_MODES, CACHE_USE, CACHE_BYPASS
 import asyncio, os
 
+def run_gemini_analysis(prompt, script, cache_mode=CACHE_USE):
+    """
+    캐시를 거쳐 Gemini 분석을 실행합니다.
+
+    Returns:
+    - (report_data, cache_status) 튜플. cache_status는 "hit", "miss", "bypass", "refresh" 중 하나
+    """
+    # 빈 스크립트는 영상과 무관하게 모두 같은 키가 되므로 캐시를 읽지도 쓰지도 않음
+    if not normalize_script(script):
+        cache_mode = CACHE_BYPASS
+    key = make_analysis_key(prompt, script)
+    if cache_mode == CACHE_USE:
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            return cached, "hit"
+
+    # gemini_analyze is an async function, so we run it using asyncio
+    report = asyncio.run(gemini_analyze(prompt, script))
+
+    # gemini_main에서 반환된 JSON 문자열을 파싱하여 객체로 변환
+    try:
+        report_data = json.loads(report)
+    except (TypeError, json.JSONDecodeError):
+        report_data = report
+
+    # 파싱된 AdAnalysisResult(JSON 객체)만 캐시
+    if cache_mode != CACHE_BYPASS and isinstance(report_data, dict):
+        analysis_cache.put(key, report_data, tag="analysis")
+
+    return report_data, ("miss" if cache_mode == CACHE_USE else cache_mode)
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     data = request.get_json()
@@ -308,19 +320,19 @@ def analyze():
     
     script = data.get('script')
     prompt = data.get('prompt', PROMPT_1)
+    cache_mode = data.get('cache', CACHE_USE)
+    if cache_mode not in CACHE_MODES:
+        return jsonify({
+            "status": "error",
+            "message": f"'cache' must be one of {', '.join(CACHE_MODES)}"
+        }), 400
     
     try:
-        # gemini_analyze is an async function, so we run it using asyncio
-        report = asyncio.run(gemini_analyze(prompt, script))
-
-        # gemini_main에서 반환된 JSON 문자열을 파싱하여 객체로 변환
-        try:
-            report_data = json.loads(report)
-        except (TypeError, json.JSONDecodeError):
-            report_data = report
+        report_data, cache_status = run_gemini_analysis(prompt, script, cache_mode)
 
         return jsonify({
             "status": "success",
+            "cache": cache_status,
             "report": report_data
         })
     except Exception as e:
@@ -334,8 +346,6 @@ def analyze():
 import json
 import asyncio
 from flask import Flask, request, jsonify
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.formatters import TextFormatter
 
 # gemini_main.py에서 분석 함수와 기본 프롬프트를 가져옵니다.
 from gemini_main import main as gemini_analyze, PROMPT_1
@@ -355,6 +365,12 @@ def analyze_youtube():
     video_url = data.get('video_url')
     languages = data.get('languages', ['ko', 'en']) # 기본 언어 설정
     custom_prompt = data.get('prompt', PROMPT_1)    # 사용자 정의 프롬프트 혹은 기본값
+    cache_mode = data.get('cache', CACHE_USE)        # 분석 결과 캐시 옵션 (use/bypass/refresh)
+    if cache_mode not in CACHE_MODES:
+        return jsonify({
+            "status": "error",
+            "message": f"'cache' must be one of {', '.join(CACHE_MODES)}"
+        }), 400
     
     # 1. YouTube Video ID 추출
     try:
@@ -364,7 +380,7 @@ def analyze_youtube():
 
     # 2. 자막 추출 (YouTubeTranscriptApi)
     try:
-        script_text = get_youtube_transcript2(video_url)
+        script_text = get_youtube_transcript2(video_url, languages)
         print('#' * 80)
         print(script_text)
         print('#' * 80)
@@ -375,20 +391,23 @@ def analyze_youtube():
             "message": f"자막을 가져오는데 실패했습니다: {str(e)}"
         }), 500
 
+    # 자막이 없으면 분석할 스크립트가 없으므로 Gemini를 호출하지 않음
+    if not normalize_script(script_text):
+        return jsonify({
+            "status": "error",
+            "video_id": video_id,
+            "message": "이 영상의 자막을 찾을 수 없어 분석할 수 없습니다."
+        }), 404
+
     # 3. Gemini 분석 (async 함수 호출)
     try:
-        # asyncio.run을 사용하여 비동기 분석 함수 실행
-        report = asyncio.run(gemini_analyze(custom_prompt, script_text))
-        
-        # gemini_main에서 반환된 JSON 문자열을 파싱하여 객체로 변환
-        try:
-            report_data = json.loads(report)
-        except (TypeError, json.JSONDecodeError):
-            report_data = report
+        # 캐시를 거쳐 비동기 분석 함수 실행
+        report_data, cache_status = run_gemini_analysis(custom_prompt, script_text, cache_mode)
 
         return jsonify({
             "status": "success",
             "video_id": video_id,
+            "cache": cache_status,
             "report": report_data
         })
 
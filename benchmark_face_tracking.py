@@ -0,0 +1,81 @@
+"""
+얼굴 검출 벤치마크: 원본 해상도로 매 샘플 MediaPipe 검출(기준) 대비
+- 축소본 검출 (--detect-sizes, 긴 변 px)
+- K번째 샘플마다 검출 + 템플릿 추적 (--intervals, 축소 크기는 --detect-max-side)
+
+같은 영상/샘플링으로 돌려서 검출 호출 수, 얼굴 단계 처리 시간,
+기준 박스 대비 IoU와 얼굴 유무 일치율을 비교합니다.
+
+사용법:
+    python benchmark_face_tracking.py --video path/to/video.mp4
+    python benchmark_face_tracking.py --video path/to/video.mp4 --stride 10 --intervals 3 5 10 --detect-sizes 640 320
+"""
+import argparse
+import time
+
+import mediapipe as mp
+
+from face_tracker import FaceTracker, iou
+from frame_sampler import FrameSampler
+from npr_engine import NPRVideoAnalyzer, DETECT_MAX_SIDE
+
+
+def run(frames, detect, interval):
+    tracker = FaceTracker(detect, detect_interval=interval)
+    start = time.perf_counter()
+    located = [tracker.locate(frame) for frame in frames]
+    elapsed = time.perf_counter() - start
+    # 첫 번째 얼굴 박스로 비교
+    boxes = [faces[0][0] if faces else None for faces in located]
+    return boxes, elapsed, tracker.stats()
+
+
+def compare(baseline, boxes):
+    both = [(a, b) for a, b in zip(baseline, boxes) if a is not None and b is not None]
+    agree = sum((a is None) == (b is None) for a, b in zip(baseline, boxes))
+    mean_iou = sum(iou(a, b) for a, b in both) / len(both) if both else 0.0
+    low_iou = sum(iou(a, b) < 0.5 for a, b in both)
+    return agree / len(baseline), mean_iou, low_iou
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--stride", type=int, default=10)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[3, 5, 10])
+    parser.add_argument("--detect-sizes", type=int, nargs="+", default=[960, 640, 320])
+    parser.add_argument("--detect-max-side", type=int, default=DETECT_MAX_SIDE)
+    args = parser.parse_args()
+
+    # 디코딩 시간은 빼고 얼굴 단계만 측정하도록 샘플 프레임을 미리 읽어둠
+    frames = [frame for _, frame in FrameSampler(args.video, strategy="stride", stride=args.stride)]
+    if not frames:
+        print("프레임을 읽지 못했습니다.")
+        return
+    h, w = frames[0].shape[:2]
+    print(f"{args.video}: 샘플 {len(frames)}개 ({w}x{h}, stride {args.stride})")
+
+    face_detection = mp.solutions.face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5)
+    analyzer = NPRVideoAnalyzer(detector=None, face_detection=face_detection)
+
+    baseline, t_base, _ = run(frames, lambda f: analyzer.detect_faces(f, 0), 1)
+    faces = sum(b is not None for b in baseline)
+    print(f"[기준 원본 해상도, K=1] 검출 {len(frames)}회, {t_base / len(frames) * 1000:.2f} ms/샘플, 얼굴 있는 샘플 {faces}개")
+
+    for size in args.detect_sizes:
+        boxes, elapsed, _ = run(frames, lambda f: analyzer.detect_faces(f, size), 1)
+        agree, mean_iou, low_iou = compare(baseline, boxes)
+        print(f"[축소 {size}px, K=1] {elapsed / len(frames) * 1000:.2f} ms/샘플 (x{t_base / elapsed:.2f}) | "
+              f"얼굴 유무 일치 {agree * 100:.1f}%, 평균 IoU {mean_iou:.3f}, IoU<0.5 샘플 {low_iou}개")
+
+    for interval in args.intervals:
+        boxes, elapsed, stats = run(frames, lambda f: analyzer.detect_faces(f, args.detect_max_side), interval)
+        agree, mean_iou, low_iou = compare(baseline, boxes)
+        print(f"[축소 {args.detect_max_side}px, K={interval}] 검출 {stats['detections']}회 (장면 전환 {stats['redetect_scene_cut']}, "
+              f"추적 실패 {stats['redetect_lost']}), {elapsed / len(frames) * 1000:.2f} ms/샘플 "
+              f"(x{t_base / elapsed:.2f}) | 얼굴 유무 일치 {agree * 100:.1f}%, "
+              f"평균 IoU {mean_iou:.3f}, IoU<0.5 샘플 {low_iou}개")
+
+
+if __name__ == "__main__":
+    main()
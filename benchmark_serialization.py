@@ -0,0 +1,107 @@
+"""
+JSON 직렬화 벤치마크: 기존 stdlib 경로(make_json_safe + json.dump indent=4) vs serialization(orjson)
+
+Extraction_*/ 폴더의 실제 산출물(data_api_origin.json, data_ytdlp_origin.json 등)을 읽어 측정합니다.
+끝이 잘린 파일은 앞부분에서 온전히 읽히는 최상위 키까지만 사용합니다.
+
+사용법:
+    python benchmark_serialization.py
+    python benchmark_serialization.py --pattern "Extraction_*/*.json" --repeat 50
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import serialization
+
+
+def make_json_safe(obj):
+    """기존 app.py의 변환 함수 (비교용)"""
+    if isinstance(obj, dict):
+        return {str(k): make_json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [make_json_safe(v) for v in obj]
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    return str(obj)
+
+
+def load_payload(path):
+    """JSON을 읽고, 잘린 파일이면 온전한 최상위 키까지만 복원합니다."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        pass
+
+    decoder = json.JSONDecoder()
+    payload = {}
+    pos = text.index("{") + 1
+    try:
+        while True:
+            key_start = text.index('"', pos)
+            key, pos = decoder.raw_decode(text, key_start)
+            pos = text.index(":", pos) + 1
+            while text[pos].isspace():
+                pos += 1
+            value, pos = decoder.raw_decode(text, pos)
+            payload[key] = value
+            pos = text.index(",", pos) + 1
+    except (ValueError, IndexError):
+        pass
+    return payload, True
+
+
+def timeit(fn, repeat):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pattern", default="Extraction_*/*.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.pattern))
+    if not paths:
+        print(f"대상 파일이 없습니다: {args.pattern}")
+        return
+
+    for path in paths:
+        payload, truncated = load_payload(path)
+        if not payload:
+            print(f"{path}: 읽을 수 있는 데이터가 없어 건너뜁니다.")
+            continue
+
+        old_text = json.dumps(make_json_safe(payload), indent=4, ensure_ascii=False, default=str)
+        new_pretty = serialization.dumps(payload, pretty=True)
+        new_compact = serialization.dumps(payload)
+
+        t_old = timeit(lambda: json.dumps(make_json_safe(payload), indent=4, ensure_ascii=False, default=str), args.repeat)
+        t_pretty = timeit(lambda: serialization.dumps(payload, pretty=True), args.repeat)
+        t_compact = timeit(lambda: serialization.dumps(payload), args.repeat)
+        t_load_old = timeit(lambda: json.loads(old_text), args.repeat)
+        t_load_new = timeit(lambda: serialization.loads(new_compact), args.repeat)
+
+        note = " (잘린 파일, 일부 키만 사용)" if truncated else ""
+        print(f"\n{path}{note} - 최상위 키 {len(payload)}개, 원본 {os.path.getsize(path) / 1024:.1f} KB")
+        print(f"  [크기] stdlib indent=4: {len(old_text.encode('utf-8')) / 1024:.1f} KB / "
+              f"orjson indent=2: {len(new_pretty) / 1024:.1f} KB / orjson compact: {len(new_compact) / 1024:.1f} KB")
+        print(f"  [쓰기] stdlib+make_json_safe: {t_old * 1000:.3f} ms / orjson indent=2: {t_pretty * 1000:.3f} ms "
+              f"(x{t_old / t_pretty:.1f}) / orjson compact: {t_compact * 1000:.3f} ms (x{t_old / t_compact:.1f})")
+        print(f"  [읽기] json.loads: {t_load_old * 1000:.3f} ms / orjson.loads: {t_load_new * 1000:.3f} ms "
+              f"(x{t_load_old / t_load_new:.1f})")
+
+        same = serialization.loads(new_compact) == json.loads(old_text)
+        print("  ✅ 내용 일치" if same else "  ❌ 내용 불일치")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ==========================================
+# 2단 캐시 (메모리 LRU + 로컬 SQLite)
+# ==========================================
+# KIPRIS 도구 결과, Gemini 분석 결과 등 JSON으로 표현 가능한 값을 TTL과 함께 보관합니다.
+# 메모리 -> SQLite 순서로 조회하고, 두 계층 모두 용량을 넘으면 가장 오래 사용되지 않은
+# 항목부터 삭제합니다.
+
+
+class TieredCache:
+    """
+    Parameters:
+    - db_path: SQLite 파일 경로 (빈 값이면 메모리만 사용)
+    - table: 캐시 테이블 이름 (같은 DB 파일을 여러 캐시가 나눠 쓸 수 있음)
+    - ttl: 항목 유효 시간(초)
+    - max_entries: 메모리에 보관할 최대 항목 수
+    - max_disk_entries: 디스크에 보관할 최대 항목 수
+    """
+
+    def __init__(self, db_path, table, ttl, max_entries, max_disk_entries):
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (expires_at, payload)
+        self._lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        key TEXT PRIMARY KEY,
+                        tag TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        expires_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                    """
+                )
+
+    def _remember(self, key, expires_at, payload):
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    f"SELECT payload, expires_at FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    payload, expires_at = row
+                    with self._conn:
+                        if expires_at > now:
+                            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+                        else:
+                            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    if expires_at > now:
+                        payload = json.loads(payload)
+                        self._remember(key, expires_at, payload)
+                        self.hits_disk += 1
+                        return payload
+
+            self.misses += 1
+            return None
+
+    def put(self, key, payload, tag=""):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, payload)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        f"INSERT OR REPLACE INTO {self.table} (key, tag, payload, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                        (key, tag, json.dumps(payload, ensure_ascii=False, separators=(",", ":")), expires_at, now),
+                    )
+                    # 만료 항목 정리 후, 용량 초과분은 가장 오래 사용되지 않은 순서로 삭제 (LRU)
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+                    self._conn.execute(
+                        f"""
+                        DELETE FROM {self.table} WHERE key IN (
+                            SELECT key FROM {self.table} ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (self.max_disk_entries,),
+                    )
+
+    def invalidate(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def stats(self):
+        with self._lock:
+            hits = self.hits_memory + self.hits_disk
+            total = hits + self.misses
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
@@ -3,7 +3,7 @@
 # pip install youtube-transcript-api 를 터미널에 입력하세요.
 
 import json
-from youtube_transcript_api import YouTubeTranscriptApi
+from transcript_store import get_transcript as fetch_cached_transcript
 from flask import Flask, jsonify
 from flask import request
 
@@ -26,15 +26,8 @@ def get_youtube_transcript(video_url, languages=None, save_to_json=None):
     video_id = video_url.split("v=")[-1].split("&")[0]
 
     try:
-        # YouTubeTranscriptApi 인스턴스 생성
-        ytt_api = YouTubeTranscriptApi()
-        
-        # 자막 가져오기
-        if languages:
-            transcript = ytt_api.fetch(video_id, languages=languages)
-        else:
-            # 언어 지정 없이 자동으로 사용 가능한 자막 선택
-            transcript = ytt_api.fetch(video_id)
+        # 자막 가져오기 (캐시 우선, 없으면 YouTubeTranscriptApi 호출)
+        transcript = fetch_cached_transcript(video_id, languages)["segments"]
         
         # JSON 파일로 저장 (옵션)
         if save_to_json:
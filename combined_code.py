@@ -13,7 +13,7 @@ def combined_function(link):
         return "Invalid YouTube URL"
     
     # yt-shorts.py의 collect_and_split_data 호출 (데이터 추출)
-    folder_path = collect_and_split_data(api_key, link, video_id)
+    folder_path = collect_and_split_data(api_key, link, video_id)["storage_path"]
     
     # 그 후 code4.py의 get_youtube_transcript 호출하여 자막 추출
     transcript = get_youtube_transcript(link)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# ==========================================
+# Extraction_<id> 폴더 산출물 매니페스트
+# ==========================================
+# 어떤 수집 단계가 언제 끝났는지, 그때 만든 파일/데이터의 해시가 무엇인지를
+# manifest.json에 기록해 두고, 같은 영상을 다시 /extract 할 때 유효한 산출물은
+# 재사용하고 TTL이 지난 단계(예: 댓글)만 다시 수집합니다.
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# 단계별 유효 기간(초). None이면 파일이 온전한 한 계속 재사용합니다.
+STAGE_TTLS = {
+    "video_info": 6 * 60 * 60,   # 조회수/좋아요 등 통계
+    "comments": 60 * 60,         # 댓글은 자주 바뀜
+    "captions": 24 * 60 * 60,    # 자막 목록
+    "download": None,            # 영상/썸네일/yt-dlp 메타데이터
+}
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_data(data):
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ArtifactManifest:
+    """
+    Parameters:
+    - target_dir: Extraction_<video_id> 폴더 경로
+
+    stages 구조:
+    {
+        "<stage>": {
+            "completed_at": 완료 시각(epoch),
+            "files": {"<파일명>": {"sha256", "size", "mtime"}},
+            "sections": {"<데이터 이름>": sha256}
+        }
+    }
+    """
+
+    def __init__(self, target_dir):
+        self.target_dir = target_dir
+        self.path = os.path.join(target_dir, MANIFEST_FILENAME)
+        self.stages = {}
+        # 수집 단계들이 여러 스레드에서 동시에 기록할 수 있음
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.stages = data.get("stages", {})
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"로그: 매니페스트를 읽지 못해 새로 만듭니다: {e}")
+
+    def _file_valid(self, name, info):
+        path = os.path.join(self.target_dir, name)
+        if not os.path.exists(path):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != info["size"]:
+            return False
+        # 크기/수정 시각이 같으면 해시 계산 생략
+        if stat.st_mtime == info["mtime"]:
+            return True
+        return hash_file(path) == info["sha256"]
+
+    def is_valid(self, stage, sections=None, ttl=None):
+        """
+        단계가 완료되었고, TTL이 지나지 않았고, 기록된 파일과 데이터가 그대로인지 확인합니다.
+
+        - sections: 현재 보관 중인 데이터 {"이름": 객체}. 기록된 해시와 비교합니다.
+        - ttl: 생략하면 STAGE_TTLS 값을 사용
+        """
+        entry = self.stages.get(stage)
+        if not entry:
+            return False
+
+        ttl = STAGE_TTLS.get(stage) if ttl is None else ttl
+        if ttl is not None and time.time() - entry["completed_at"] > ttl:
+            return False
+
+        for name, info in entry.get("files", {}).items():
+            if not self._file_valid(name, info):
+                return False
+
+        recorded = entry.get("sections", {})
+        for name, data in (sections or {}).items():
+            if data is None or recorded.get(name) != hash_data(data):
+                return False
+        return True
+
+    def record(self, stage, files=(), sections=None):
+        """단계 완료를 기록하고 매니페스트를 바로 저장합니다. (중간에 실패해도 완료된 단계는 남도록)"""
+        file_entries = {}
+        for name in files:
+            path = os.path.join(self.target_dir, name) if name else None
+            if not path or not os.path.exists(path):
+                continue
+            stat = os.stat(path)
+            file_entries[name] = {"sha256": hash_file(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+        entry = {
+            "completed_at": time.time(),
+            "files": file_entries,
+            "sections": {name: hash_data(data) for name, data in (sections or {}).items()},
+        }
+        with self._lock:
+            self.stages[stage] = entry
+            self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "stages": self.stages}, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,195 @@
+import cv2
+import numpy as np
+
+# ==========================================
+# 얼굴 위치 추적 (검출 횟수 줄이기)
+# ==========================================
+# 토킹헤드 광고처럼 얼굴이 거의 같은 자리에 있는 영상에서 매 샘플마다 MediaPipe 검출을
+# 돌리지 않도록, K번째 샘플마다만 검출하고 그 사이에는 축소 흑백 템플릿 매칭으로
+# 박스를 옮깁니다. 장면 전환(scene cut)이나 추적 실패(매칭 점수 하락) 시에는 바로 다시 검출합니다.
+
+DETECT_INTERVAL = 5         # 샘플 K개마다 한 번 검출 (1이면 매 샘플 검출 = 기존 동작)
+SCENE_CUT_THRESHOLD = 30.0  # 축소 흑백 프레임 평균 밝기 차이(0~255)가 이 값을 넘으면 장면 전환
+MIN_MATCH_SCORE = 0.6       # 템플릿 매칭 점수(TM_CCOEFF_NORMED)가 이보다 낮으면 추적 실패
+SMOOTHING = 0.6             # 재검출 박스가 이전 박스와 겹칠 때 새 박스 반영 비율 (EMA)
+IOU_MATCH = 0.3             # 이 이상 겹치면 같은 얼굴로 보고 박스를 부드럽게 이어 붙임
+
+TEMPLATE_SIZE = 32          # 템플릿 긴 변 길이(px)
+SEARCH_MARGIN = 0.5         # 다음 프레임에서 찾을 범위 (박스 크기 대비 여백 비율)
+SCENE_THUMB_SIZE = (32, 32)
+
+
+def iou(a, b):
+    """상대 좌표 박스 (xmin, ymin, width, height) 두 개의 IoU"""
+    ax2, ay2 = a[0] + a[2], a[1] + a[3]
+    bx2, by2 = b[0] + b[2], b[1] + b[3]
+    iw = max(0.0, min(ax2, bx2) - max(a[0], b[0]))
+    ih = max(0.0, min(ay2, by2) - max(a[1], b[1]))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def shrink_gray(img, size):
+    """
+    img를 size=(width, height)로 줄인 흑백 이미지.
+    큰 배율로 INTER_AREA를 바로 쓰면 원본 전체를 읽어 느리므로, 먼저 간격을 두고 픽셀을 건너뛴 뒤
+    (목표 크기의 약 4배) 남은 작은 이미지에만 INTER_AREA를 적용합니다.
+    """
+    h, w = img.shape[:2]
+    step = max(min(h // (size[1] * 4), w // (size[0] * 4)), 1)
+    if step > 1:
+        img = img[::step, ::step]
+    small = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
+def scene_thumbnail(frame):
+    """장면 비교용 축소 흑백 이미지"""
+    return shrink_gray(frame, SCENE_THUMB_SIZE)
+
+
+class FaceTracker:
+    """
+    Parameters:
+    - detect: frame(BGR) -> [(상대 좌표 박스 (xmin, ymin, width, height), 확신도), ...] 를 반환하는 검출 함수
+    - detect_interval: 샘플 K개마다 한 번 검출
+    - scene_cut_threshold, min_match_score, smoothing: 위 상수 참고
+
+    locate(frame)을 샘플 순서대로 호출하면 그 프레임의 얼굴 목록 [(박스, 확신도), ...]을 돌려줍니다.
+    여러 얼굴을 각각의 템플릿으로 추적하고, 하나라도 놓치면 다시 검출합니다.
+    """
+
+    def __init__(self, detect, detect_interval=DETECT_INTERVAL, scene_cut_threshold=SCENE_CUT_THRESHOLD,
+                 min_match_score=MIN_MATCH_SCORE, smoothing=SMOOTHING):
+        self.detect = detect
+        self.detect_interval = max(int(detect_interval), 1)
+        self.scene_cut_threshold = scene_cut_threshold
+        self.min_match_score = min_match_score
+        # 매 샘플 검출(K=1)일 때는 기존 동작과 같도록 박스를 섞지 않음
+        self.smoothing = smoothing if self.detect_interval > 1 else 1.0
+
+        self.faces = []
+        self._has_state = False       # 한 번이라도 검출했는지 (얼굴 없음도 상태로 유지)
+        self._since_detect = 0
+        self._templates = []          # 얼굴별 (흑백 템플릿, 축소 배율) 또는 None
+        self._prev_thumb = None
+
+        self.detections = 0
+        self.tracked = 0
+        self.redetect_scene_cut = 0
+        self.redetect_lost = 0
+
+    def reset(self):
+        """새 구간을 읽기 전에 위치/장면 상태만 초기화합니다. (통계는 유지)"""
+        self.faces = []
+        self._has_state = False
+        self._since_detect = 0
+        self._templates = []
+        self._prev_thumb = None
+
+    @staticmethod
+    def _to_pixels(bbox, iw, ih):
+        x = max(int(bbox[0] * iw), 0)
+        y = max(int(bbox[1] * ih), 0)
+        w = min(int(bbox[2] * iw), iw - x)
+        h = min(int(bbox[3] * ih), ih - y)
+        return x, y, w, h
+
+    @classmethod
+    def _make_template(cls, frame, bbox):
+        ih, iw = frame.shape[:2]
+        x, y, w, h = cls._to_pixels(bbox, iw, ih)
+        if w < 4 or h < 4:
+            return None
+        scale = TEMPLATE_SIZE / max(w, h)
+        return shrink_gray(frame[y:y+h, x:x+w], (max(int(w * scale), 1), max(int(h * scale), 1))), scale
+
+    def _track(self, frame, bbox, template):
+        """템플릿 매칭으로 박스를 옮깁니다. 실패하면 None."""
+        if template is None:
+            return None
+        template, scale = template
+        ih, iw = frame.shape[:2]
+        x, y, w, h = self._to_pixels(bbox, iw, ih)
+        mx, my = int(w * SEARCH_MARGIN), int(h * SEARCH_MARGIN)
+        x0, y0 = max(x - mx, 0), max(y - my, 0)
+        x1, y1 = min(x + w + mx, iw), min(y + h + my, ih)
+
+        region = shrink_gray(frame[y0:y1, x0:x1],
+                             (max(int((x1 - x0) * scale), 1), max(int((y1 - y0) * scale), 1)))
+
+        th, tw = template.shape
+        if region.shape[0] < th or region.shape[1] < tw:
+            return None
+        result = cv2.matchTemplate(region, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(result)
+        if not np.isfinite(score) or score < self.min_match_score:
+            return None
+
+        nx = x0 + loc[0] / scale
+        ny = y0 + loc[1] / scale
+        return (nx / iw, ny / ih, bbox[2], bbox[3])
+
+    def _smooth(self, found):
+        """새 박스마다 가장 많이 겹치는 이전 박스가 있으면 섞어서 떨림을 줄임"""
+        if self.smoothing >= 1.0 or not self.faces:
+            return found
+        smoothed = []
+        for bbox, confidence in found:
+            best = max(self.faces, key=lambda face: iou(bbox, face[0]))[0]
+            if iou(bbox, best) >= IOU_MATCH:
+                s = self.smoothing
+                bbox = tuple(s * n + (1 - s) * p for n, p in zip(bbox, best))
+            smoothed.append((bbox, confidence))
+        return smoothed
+
+    def _redetect(self, frame):
+        found = list(self.detect(frame))
+        self.detections += 1
+        self.faces = self._smooth(found)
+        self._has_state = True
+        self._since_detect = 0
+        if self.detect_interval > 1:
+            self._templates = [self._make_template(frame, bbox) for bbox, _ in self.faces]
+        return self.faces
+
+    def locate(self, frame):
+        if self.detect_interval == 1:
+            return self._redetect(frame)
+
+        thumb = scene_thumbnail(frame)
+        scene_cut = (self._prev_thumb is not None and
+                     float(cv2.absdiff(thumb, self._prev_thumb).mean()) > self.scene_cut_threshold)
+        self._prev_thumb = thumb
+
+        if scene_cut and self._has_state:
+            self.redetect_scene_cut += 1
+            # 장면이 바뀌면 이전 얼굴 위치는 의미가 없으므로 섞지 않음
+            self.faces = []
+            return self._redetect(frame)
+        if not self._has_state or self._since_detect + 1 >= self.detect_interval:
+            return self._redetect(frame)
+
+        self._since_detect += 1
+        moved = []
+        for (bbox, confidence), template in zip(self.faces, self._templates):
+            new_bbox = self._track(frame, bbox, template)
+            if new_bbox is None:
+                self.redetect_lost += 1
+                return self._redetect(frame)
+            moved.append((new_bbox, confidence))
+
+        # 직전 검출에서 얼굴이 없었고 장면도 그대로면 다음 검출 시점까지 얼굴 없음 유지
+        self.tracked += 1
+        self.faces = moved
+        return self.faces
+
+    def stats(self):
+        return {
+            "detect_interval": self.detect_interval,
+            "detections": self.detections,
+            "tracked": self.tracked,
+            "redetect_scene_cut": self.redetect_scene_cut,
+            "redetect_lost": self.redetect_lost,
+        }
@@ -0,0 +1,172 @@
+import cv2
+
+# ==========================================
+# 영상 프레임 샘플러 (순차 디코딩)
+# ==========================================
+# cap.set(CAP_PROP_POS_FRAMES, i) 로 매 프레임마다 seek 하면
+# 디코더가 직전 키프레임으로 돌아가 다시 디코딩하므로, 파일을 처음부터 한 번만
+# 순서대로 읽으면서 grab()으로 넘기고 샘플 대상 프레임만 retrieve() 합니다.
+
+STRATEGIES = ("stride", "fps", "keyframe", "indices")
+SEEK_MIN_GAP = 120  # strategy="indices"에서 다음 프레임까지 이보다 멀면 순차로 넘기지 않고 seek (대략 GOP 길이)
+
+
+def can_decode(video_path):
+    """OpenCV가 이 영상의 첫 프레임을 실제로 디코딩할 수 있는지 확인합니다."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return False
+        success, _ = cap.read()
+        return bool(success)
+    finally:
+        cap.release()
+
+
+class FrameSampler:
+    """
+    영상을 한 번만 순차적으로 읽으며 샘플링된 프레임을 돌려주는 이터레이터
+
+    Parameters:
+    - video_path: 분석할 영상 경로
+    - strategy: "stride" (N 프레임마다), "fps" (초당 N 프레임), "keyframe" (키프레임만), "indices" (지정한 프레임만)
+    - stride: strategy="stride"일 때 샘플 간격
+    - frames_per_second: strategy="fps"일 때 초당 샘플 수
+    - indices: strategy="indices"일 때 읽을 프레임 번호 목록
+      (드문드문한 번호는 seek_min_gap보다 멀면 seek하고, 가까우면 순차로 넘김)
+    - seek_min_gap: 위 상수 참고
+
+    Yields:
+    - (frame_index, frame) 튜플 (frame은 BGR numpy 배열)
+    """
+
+    def __init__(self, video_path, strategy="stride", stride=10, frames_per_second=2.0, indices=None,
+                 seek_min_gap=SEEK_MIN_GAP):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"지원하지 않는 샘플링 방식입니다: {strategy} (가능: {', '.join(STRATEGIES)})")
+        if stride < 1:
+            raise ValueError("stride는 1 이상이어야 합니다.")
+        if frames_per_second <= 0:
+            raise ValueError("frames_per_second는 0보다 커야 합니다.")
+        if strategy == "indices" and not indices:
+            raise ValueError("strategy=\"indices\"에는 indices가 필요합니다.")
+
+        self.video_path = video_path
+        self.strategy = strategy
+        self.stride = int(stride)
+        self.frames_per_second = float(frames_per_second)
+        self.indices = frozenset(int(i) for i in indices) if indices else frozenset()
+        self.seek_min_gap = int(seek_min_gap)
+        self.decoded_frames = 0  # 마지막 반복에서 grab()한 프레임 수
+        self.seeks = 0
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"영상을 열 수 없습니다: {video_path}")
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        cap.release()
+
+    def _time_step(self):
+        """strategy="fps"에서 샘플 사이의 프레임 간격 (소수)"""
+        return max(self.fps / self.frames_per_second, 1.0)
+
+    def _keyframe_indices(self):
+        """
+        디코딩 없이 패킷만 읽어서(raw 모드) 키프레임 인덱스를 찾습니다.
+        FFmpeg 백엔드가 아니거나 속성을 지원하지 않으면 None을 반환합니다.
+        """
+        prop = getattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME", None)
+        if prop is None:
+            return None
+
+        cap = cv2.VideoCapture(self.video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        if not cap.isOpened():
+            return None
+
+        indices = set()
+        index = 0
+        try:
+            while cap.grab():
+                flag = cap.get(prop)
+                if flag < 0:
+                    # 백엔드가 속성을 지원하지 않음
+                    return None
+                if flag > 0:
+                    indices.add(index)
+                index += 1
+        finally:
+            cap.release()
+        return indices or None
+
+    def _selector(self):
+        """프레임 인덱스를 받아 샘플 대상 여부를 돌려주는 함수를 만듭니다."""
+        if self.strategy == "stride":
+            return lambda i: i % self.stride == 0
+
+        if self.strategy == "keyframe":
+            keyframes = self._keyframe_indices()
+            if keyframes is not None:
+                return lambda i: i in keyframes
+            print("로그: 키프레임 정보를 읽을 수 없어 1초 간격 샘플링으로 대체합니다.")
+            step = max(int(round(self.fps)), 1)
+            return lambda i: i % step == 0
+
+        # strategy == "fps": 누적 시간 기준으로 다음 샘플 시점을 계산
+        step = self._time_step()
+        next_at = 0.0
+
+        def select(i):
+            nonlocal next_at
+            if i + 0.5 >= next_at:
+                next_at += step
+                return True
+            return False
+
+        return select
+
+    def _iter_indices(self):
+        """strategy="indices": 지정한 프레임만 읽고, 멀리 떨어진 프레임은 seek로 건너뜁니다."""
+        cap = cv2.VideoCapture(self.video_path)
+        index = 0
+        try:
+            for target in sorted(self.indices):
+                if target - index > self.seek_min_gap:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                    index = target
+                    self.seeks += 1
+                while index < target and cap.grab():
+                    self.decoded_frames += 1
+                    index += 1
+                if index < target or not cap.grab():
+                    break  # 영상 끝
+                self.decoded_frames += 1
+                success, frame = cap.retrieve()
+                if not success:
+                    break
+                yield target, frame
+                index += 1
+        finally:
+            cap.release()
+
+    def __iter__(self):
+        self.decoded_frames = 0
+        self.seeks = 0
+        if self.strategy == "indices":
+            yield from self._iter_indices()
+            return
+
+        select = self._selector()
+        cap = cv2.VideoCapture(self.video_path)
+        index = 0
+        try:
+            while cap.grab():
+                self.decoded_frames += 1
+                if select(index):
+                    success, frame = cap.retrieve()
+                    if not success:
+                        break
+                    yield index, frame
+                index += 1
+        finally:
+            cap.release()
@@ -0,0 +1,124 @@
+import os
+import queue
+import threading
+
+import cv2
+
+# ==========================================
+# 분석 프레임 저장 (백그라운드 스레드)
+# ==========================================
+# JPEG 인코딩과 디스크 쓰기를 추론 루프 밖의 전용 스레드에서 처리합니다.
+# 큐는 크기가 제한되어 있고, 가득 차면 추론을 멈추지 않도록 해당 프레임 저장을 건너뜁니다.
+
+SAVE_MODES = ("none", "full", "face", "thumbnail")
+FRAME_WRITER_QUEUE_SIZE = 64
+THUMBNAIL_SIZE = 320  # thumbnail 모드에서 긴 변 길이(px)
+JPEG_QUALITY = 90
+
+_STOP = object()
+
+
+def parse_save_mode(value):
+    """save_frames 옵션 값을 저장 모드로 바꿉니다. (이전 형식의 true/false도 허용)"""
+    if value is None or value is False:
+        return "none"
+    if value is True:
+        return "full"
+    mode = str(value).strip().lower()
+    if mode in ("true", "1", "yes", "on"):
+        return "full"
+    if mode in ("false", "0", "no", "off", ""):
+        return "none"
+    if mode not in SAVE_MODES:
+        raise ValueError(f"지원하지 않는 프레임 저장 방식입니다: {value} (가능: {', '.join(SAVE_MODES)})")
+    return mode
+
+
+class FrameWriter:
+    """
+    Parameters:
+    - base_dir: frames_ai / frames_real 폴더를 만들 위치
+    - mode: "full"(원본 프레임), "face"(추론에 쓴 얼굴 crop), "thumbnail"(긴 변 thumbnail_size로 축소)
+    - max_queue: 대기열 최대 길이
+    - thumbnail_size: thumbnail 모드의 긴 변 길이
+
+    with 문으로 사용하면 끝날 때 남은 프레임을 모두 쓰고 스레드를 정리합니다.
+    """
+
+    def __init__(self, base_dir, mode="full", max_queue=FRAME_WRITER_QUEUE_SIZE, thumbnail_size=THUMBNAIL_SIZE):
+        if mode not in SAVE_MODES or mode == "none":
+            raise ValueError(f"FrameWriter에 사용할 수 없는 저장 방식입니다: {mode}")
+        self.mode = mode
+        self.thumbnail_size = int(thumbnail_size)
+        self.ai_dir = os.path.join(base_dir, "frames_ai")
+        self.real_dir = os.path.join(base_dir, "frames_real")
+        os.makedirs(self.ai_dir, exist_ok=True)
+        os.makedirs(self.real_dir, exist_ok=True)
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame_index, is_fake, frame, crop=None):
+        """
+        저장할 프레임을 대기열에 넣습니다. 큐가 가득 차 있으면 기다리지 않고 건너뜁니다.
+
+        - crop: face 모드에서 저장할 얼굴 crop (없으면 저장하지 않음)
+        """
+        image = crop if self.mode == "face" else frame
+        if image is None:
+            return False
+        path = os.path.join(self.ai_dir if is_fake else self.real_dir, f"frame_{frame_index:06d}.jpg")
+        try:
+            self._queue.put_nowait((path, image))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _encode(self, image):
+        if self.mode == "thumbnail":
+            h, w = image.shape[:2]
+            scale = self.thumbnail_size / max(h, w)
+            if scale < 1:
+                image = cv2.resize(image, (max(int(w * scale), 1), max(int(h * scale), 1)),
+                                   interpolation=cv2.INTER_AREA)
+        success, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        return buf if success else None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            path, image = item
+            try:
+                buf = self._encode(image)
+                if buf is None:
+                    self.failed += 1
+                    continue
+                with open(path, "wb") as f:
+                    f.write(buf.tobytes())
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"로그: 프레임 저장 실패 ({path}): {e}")
+
+    def close(self):
+        """남은 프레임을 모두 쓰고 스레드를 종료한 뒤 통계를 반환합니다."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        return self.stats()
+
+    def stats(self):
+        return {"mode": self.mode, "written": self.written, "dropped": self.dropped, "failed": self.failed}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,16 +1,18 @@
 import asyncio
 import os
-import json
 from datetime import datetime
 from google import genai
 from google.genai import types
 from typing import Literal, List, Optional
 from typing_extensions import TypedDict
 from dotenv import load_dotenv
-from mcp_connector import get_kipris_connector
+from mcp_connector import get_kipris_pool
+from serialization import dumps_str, loads, JSONDecodeError
 
 # --- Configuration ---
 USE_JSON_OUTPUT = True  # Set to True to enable JSON structured output
+GEMINI_MODEL = "gemini-3-flash-preview"
+MAX_PARALLEL_TOOL_CALLS = 4  # Max concurrent MCP tool calls within one Gemini turn
 # ---------------------
 
 class GeminiDebugLogger:
@@ -79,7 +81,7 @@ class GeminiDebugLogger:
                 if step['function_calls']:
                     report.append("#### 🛠️ Tool Usage (Function Calls)")
                     for fc in step['function_calls']:
-                        args_json = json.dumps(fc.args, indent=2, ensure_ascii=False)
+                        args_json = dumps_str(fc.args, pretty=True)
                         report.append(f"- **Tool**: `{fc.name}`")
                         report.append(f"- **Arguments**:\n```json\n  {args_json}\n```")
                 report.append("---")
@@ -411,62 +413,77 @@ class AdAnalysisResult(TypedDict):
     consultation: str
 # --------------------
 
+async def call_mcp_tool(connector, name, args, limit):
+    """Run one MCP tool call; returns (content_text, error) instead of raising."""
+    async with limit:
+        try:
+            result = await connector.call_tool(name, args)
+            content_text = "\n".join([c.text for c in result.content if hasattr(c, 'text')]) if hasattr(result, 'content') else str(result)
+            return content_text, None
+        except Exception as e:
+            print(f"도구 호출 오류 ({name}): {e}")
+            return None, str(e)
+
+# Read .env once at import so the analysis coroutine never blocks on file I/O
+load_dotenv()
+
 async def main(prompt, script):
-    load_dotenv()
     api_key = os.getenv("API_KEY")
     client = genai.Client(api_key=api_key)
 
-    # 1. Start KIPRIS MCP Connector
-    connector = await get_kipris_connector()
-    kipris_tools = await connector.get_gemini_tools()
+    # 1. Borrow a warm KIPRIS MCP session from the process-wide pool
+    kipris_pool = get_kipris_pool()
+    connector = await kipris_pool.acquire()
+    # 빌린 세션은 어떤 단계에서 실패하더라도 반드시 풀에 반환 (finally)
+    try:
+        kipris_tools = await connector.get_gemini_tools()
 
 
-    # 2. Add Google Search grounding tool
-    google_search_tool = types.Tool(google_search=types.GoogleSearch())
+        # 2. Add Google Search grounding tool
+        google_search_tool = types.Tool(google_search=types.GoogleSearch())
     
-    # 3. Combine tools
-    # Attempting to combine both into a single Tool object to avoid compatibility issues
+        # 3. Combine tools
+        # Attempting to combine both into a single Tool object to avoid compatibility issues
     
-    if USE_JSON_OUTPUT:
-        target_prompt = PROMPT_6
-        # Configure for JSON output
-        config = types.GenerateContentConfig(
-            tools=[
-                types.Tool(
-                    google_search=types.GoogleSearch(),
-                    function_declarations=kipris_tools
-                )
-            ],
-            response_mime_type="application/json",
-            response_schema=AdAnalysisResult
-        )
-        print("모드: JSON 구조화 출력 (PROMPT_6)")
-    else:
-        target_prompt = PROMPT_5
-        # Original configuration
-        config = types.GenerateContentConfig(
-            tools=[
-                types.Tool(
-                    google_search=types.GoogleSearch(),
-                    function_declarations=kipris_tools
-                )
-            ]
-        )
-        print("모드: 일반 텍스트 출력 (PROMPT_5)")
-
-    full_prompt = f"{target_prompt}\n\n[광고 스크립트]:\n{script}"
-    history = [types.Content(role="user", parts=[types.Part(text=full_prompt)])]
-
-    # Init Logger
-    logger = GeminiDebugLogger()
-    logger.log_api_call("user", full_prompt)
-
-    print("Gemini에게 요청을 보내는 중(KIPRIS + Google Search)...")
+        if USE_JSON_OUTPUT:
+            target_prompt = PROMPT_6
+            # Configure for JSON output
+            config = types.GenerateContentConfig(
+                tools=[
+                    types.Tool(
+                        google_search=types.GoogleSearch(),
+                        function_declarations=kipris_tools
+                    )
+                ],
+                response_mime_type="application/json",
+                response_schema=AdAnalysisResult
+            )
+            print("모드: JSON 구조화 출력 (PROMPT_6)")
+        else:
+            target_prompt = PROMPT_5
+            # Original configuration
+            config = types.GenerateContentConfig(
+                tools=[
+                    types.Tool(
+                        google_search=types.GoogleSearch(),
+                        function_declarations=kipris_tools
+                    )
+                ]
+            )
+            print("모드: 일반 텍스트 출력 (PROMPT_5)")
+
+        full_prompt = f"{target_prompt}\n\n[광고 스크립트]:\n{script}"
+        history = [types.Content(role="user", parts=[types.Part(text=full_prompt)])]
+
+        # Init Logger
+        logger = GeminiDebugLogger()
+        logger.log_api_call("user", full_prompt)
+
+        print("Gemini에게 요청을 보내는 중(KIPRIS + Google Search)...")
     
-    try:
         # Initial call
-        response = client.models.generate_content(
-            model="gemini-3-flash-preview", 
+        response = await client.aio.models.generate_content(
+            model=GEMINI_MODEL, 
             contents=history,
             config=config
         )
@@ -478,6 +495,7 @@ async def main(prompt, script):
 
         max_turns = 10
         turn_count = 0
+        turn_limit = asyncio.Semaphore(MAX_PARALLEL_TOOL_CALLS)
         total_usage = response.usage_metadata
         current_response = response
 
@@ -486,7 +504,7 @@ async def main(prompt, script):
             # Add model's response to history
             history.append(current_response.candidates[0].content)
             
-            tool_parts = []
+            calls = []
             for part in current_response.candidates[0].content.parts:
                 if part.function_call:
                     name = part.function_call.name
@@ -499,21 +517,26 @@ async def main(prompt, script):
                         continue
 
                     print(f"로그: MCP 도구 호출 중 - {name}({args})")
-                    
-                    # 2. Execute MCP tool
-                    try:
-                        result = await connector.call_tool(name, args)
-                        content_text = "\n".join([c.text for c in result.content if hasattr(c, 'text')]) if hasattr(result, 'content') else str(result)
-                        logger.log_tool_result(name, content_text)
-                        tool_parts.append(types.Part.from_function_response(name=name, response={"result": content_text}))
-                    except Exception as e:
-                        print(f"도구 호출 오류 ({name}): {e}")
-                        tool_parts.append(types.Part.from_function_response(name=name, response={"error": str(e)}))
+                    calls.append((name, args))
+
+            # 2. Execute all MCP tools of this turn concurrently (bounded per turn).
+            # Results keep the original part order and one failure doesn't cancel the others.
+            results = await asyncio.gather(
+                *(call_mcp_tool(connector, name, args, turn_limit) for name, args in calls)
+            ) if calls else []
+
+            tool_parts = []
+            for (name, _), (content_text, error) in zip(calls, results):
+                if error is None:
+                    logger.log_tool_result(name, content_text)
+                    tool_parts.append(types.Part.from_function_response(name=name, response={"result": content_text}))
+                else:
+                    tool_parts.append(types.Part.from_function_response(name=name, response={"error": error}))
             
             if tool_parts:
                 history.append(types.Content(role="tool", parts=tool_parts))
-                current_response = client.models.generate_content(
-                    model="gemini-3-flash-preview",
+                current_response = await client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
                     contents=history,
                     config=config
                 )
@@ -540,9 +563,9 @@ async def main(prompt, script):
         if USE_JSON_OUTPUT:
             try:
                 # Pretty print JSON
-                json_data = json.loads(final_text)
-                print(json.dumps(json_data, indent=2, ensure_ascii=False))
-            except json.JSONDecodeError:
+                json_data = loads(final_text)
+                print(dumps_str(json_data, pretty=True))
+            except JSONDecodeError:
                 print("JSON 파싱 실패:")
                 print(final_text)
         else:
@@ -554,16 +577,18 @@ async def main(prompt, script):
         text_with_citations = add_citations(current_response)
         
         # Finalize Usage and Log
+        # File writes run in a worker thread so the event loop stays free for other analyses
         logger.set_usage(total_usage)
-        debug_path = logger.save()
+        debug_path = await asyncio.to_thread(logger.save)
         print(f"\n[Debug] 상세 API 호출 흐름이 저장되었습니다: {debug_path}")
 
-        save_response_to_file(total_usage, PROMPT_1, text_with_citations)
+        await asyncio.to_thread(save_response_to_file, total_usage, PROMPT_1, text_with_citations)
 
         return final_text
     finally:
-        await connector.disconnect()
-        print("로그: MCP 커넥터가 종료되었습니다.")
+        await kipris_pool.release(connector)
+        print("로그: MCP 커넥터를 풀에 반환했습니다.")
+        await client.aio.aclose()
 
 
 def add_citations(response):
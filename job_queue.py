@@ -0,0 +1,238 @@
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from serialization import dumps_str
+
+# ==========================================
+# 백그라운드 작업 큐 (SQLite 영속화)
+# ==========================================
+# 오래 걸리는 파이프라인(/extract 등)을 요청 스레드 밖에서 실행하고,
+# 단계별 진행 상황을 로컬 SQLite에 저장해 서버 재시작 후에도 이어서 처리합니다.
+
+JOB_DB_PATH = "jobs.sqlite3"
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# 단계 상태
+STAGE_PENDING = "pending"
+STAGE_RUNNING = "running"
+STAGE_DONE = "done"
+STAGE_FAILED = "failed"
+
+
+class JobStore:
+    """작업 상태를 SQLite에 저장/조회합니다. (스레드 안전)"""
+
+    def __init__(self, db_path=JOB_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stages TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            # 이전 버전 DB에는 dedupe_key 컬럼이 없으므로 추가
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "dedupe_key" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN dedupe_key TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (kind, dedupe_key, status)")
+
+    def create(self, kind, payload, stage_names, dedupe_key=None):
+        """
+        작업을 만들고 (job_id, 새로 만들었는지)를 반환합니다.
+        dedupe_key가 같은 queued/running 작업이 이미 있으면 새로 만들지 않고 그 작업의 id를 돌려줍니다.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        stages = [{"name": name, "status": STAGE_PENDING, "detail": None} for name in stage_names]
+        with self._lock, self._conn:
+            # 다른 프로세스와 동시에 확인/추가하지 않도록 쓰기 잠금을 먼저 잡음
+            self._conn.execute("BEGIN IMMEDIATE")
+            if dedupe_key is not None:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE kind = ? AND dedupe_key = ? AND status IN (?, ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (kind, dedupe_key, QUEUED, RUNNING),
+                ).fetchone()
+                if row is not None:
+                    return row["id"], False
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, stages, dedupe_key, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, ensure_ascii=False), QUEUED,
+                 json.dumps(stages, ensure_ascii=False), dedupe_key, now, now),
+            )
+        return job_id, True
+
+    def claim(self, job_id):
+        """queued 상태인 작업을 running으로 바꿉니다. 이미 다른 워커가 가져갔으면 False."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED),
+            )
+            return cur.rowcount == 1
+
+    def finish(self, job_id, status, result=None, error=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, dumps_str(result) if result is not None else None,
+                 error, time.time(), job_id),
+            )
+
+    def set_stage(self, job_id, stage_name, status, detail=None):
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row["stages"])
+            for stage in stages:
+                if stage["name"] == stage_name:
+                    stage["status"] = status
+                    stage["detail"] = detail
+                    break
+            self._conn.execute(
+                "UPDATE jobs SET stages = ?, updated_at = ? WHERE id = ?",
+                (dumps_str(stages), time.time(), job_id),
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "payload": json.loads(row["payload"]),
+            "status": row["status"],
+            "stages": json.loads(row["stages"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def requeue_unfinished(self):
+        """재시작 시 끝나지 않은 작업(queued/running)을 다시 queued로 돌리고 id 목록을 반환합니다."""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?", (QUEUED, time.time(), RUNNING)
+            )
+        return [row["id"] for row in rows]
+
+
+class JobContext:
+    """작업 핸들러에 전달되어 단계별 진행 상황을 기록합니다."""
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+        self.current_stage = None
+
+    def start_stage(self, name, detail=None):
+        self.current_stage = name
+        self.store.set_stage(self.job_id, name, STAGE_RUNNING, detail)
+
+    def finish_stage(self, name, detail=None):
+        self.current_stage = None
+        self.store.set_stage(self.job_id, name, STAGE_DONE, detail)
+
+    def fail_stage(self, name, detail=None):
+        self.store.set_stage(self.job_id, name, STAGE_FAILED, detail)
+
+
+class JobQueue:
+    """
+    워커 풀에서 등록된 핸들러를 실행하는 작업 큐
+
+    handler(payload, ctx) 형태로 호출되며, 반환값이 작업 결과(result)로 저장됩니다.
+    """
+
+    def __init__(self, store, max_workers=2):
+        self.store = store
+        self.handlers = {}
+        self.stage_names = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._resumed = False
+        self._resume_lock = threading.Lock()
+
+    def register(self, kind, handler, stage_names):
+        self.handlers[kind] = handler
+        self.stage_names[kind] = list(stage_names)
+
+    def submit(self, kind, payload, dedupe_key=None):
+        """
+        작업을 등록하고 (job_id, 새로 등록했는지)를 반환합니다.
+
+        - dedupe_key: 같은 키의 작업이 대기/실행 중이면 새로 실행하지 않고 그 작업 id를 반환
+          (예: 같은 영상의 Extraction 폴더를 두 작업이 동시에 건드리지 않도록 video_id 사용)
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"등록되지 않은 작업 종류입니다: {kind}")
+        job_id, created = self.store.create(kind, payload, self.stage_names[kind], dedupe_key=dedupe_key)
+        if created:
+            self._executor.submit(self._run, job_id)
+        return job_id, created
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def resume(self):
+        """끝나지 않은 작업을 다시 큐에 넣습니다. (프로세스당 한 번만 동작)"""
+        with self._resume_lock:
+            if self._resumed:
+                return []
+            self._resumed = True
+        job_ids = self.store.requeue_unfinished()
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id)
+        if job_ids:
+            print(f"로그: 미완료 작업 {len(job_ids)}건을 다시 실행합니다.")
+        return job_ids
+
+    def _run(self, job_id):
+        if not self.store.claim(job_id):
+            return
+        job = self.store.get(job_id)
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self.store.finish(job_id, FAILED, error=f"등록되지 않은 작업 종류입니다: {job['kind']}")
+            return
+
+        ctx = JobContext(self.store, job_id)
+        try:
+            result = handler(job["payload"], ctx)
+            self.store.finish(job_id, SUCCEEDED, result=result)
+        except Exception as e:
+            traceback.print_exc()
+            if ctx.current_stage:
+                ctx.fail_stage(ctx.current_stage, str(e))
+            self.store.finish(job_id, FAILED, error=str(e))
@@ -1,43 +1,232 @@
 import asyncio
+import atexit
+import hashlib
+import importlib.metadata
+import json
 import os
 import sys
-from contextlib import AsyncExitStack
+import threading
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.types import CallToolResult
 from google.genai import types
 from dotenv import load_dotenv
+from cache_store import TieredCache
+
+# ==========================================
+# Gemini FunctionDeclaration 캐시
+# ==========================================
+# KIPRIS 도구 목록은 배포 사이에 바뀌지 않으므로, 서버 식별자(실행 명령 + 설치된 서버 코드 버전
+# + 서버 이름/버전)를 키로 변환된 선언을 메모리와 디스크에 보관합니다.
+# FastMCP 서버의 serverInfo.version은 MCP SDK 버전이라 서버 코드가 바뀌어도 그대로이므로,
+# 설치된 mcp-kipris 배포판 버전(git 설치면 커밋 해시)을 함께 씁니다. 버전이 바뀌면 키가 달라져
+# 자동으로 무효화되고, 같은 실행 명령의 이전 버전 항목은 저장 시 정리됩니다.
+
+TOOL_CACHE_PATH = os.getenv("MCP_TOOL_CACHE_PATH", "mcp_tool_cache.json")  # 빈 문자열이면 디스크 캐시 사용 안 함
+
+
+class ToolDeclarationCache:
+    def __init__(self, path=TOOL_CACHE_PATH):
+        self.path = path
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._disk_loaded = False
+
+    def _load_disk(self):
+        if self._disk_loaded or not self.path:
+            return
+        self._disk_loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._memory = {**json.load(f), **self._memory}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"로그: 도구 선언 캐시 파일을 읽지 못했습니다 (무시): {e}")
+
+    def _save_disk(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._memory, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"로그: 도구 선언 캐시 파일을 저장하지 못했습니다 (무시): {e}")
+
+    def get(self, key):
+        with self._lock:
+            self._load_disk()
+            return self._memory.get(key)
+
+    def find_by_schema_hash(self, command, schema_hash):
+        """같은 서버(실행 명령)의 다른 버전이라도 도구 스키마가 동일하면 변환 결과를 재사용합니다."""
+        with self._lock:
+            self._load_disk()
+            for entry in self._memory.values():
+                if entry.get("command") == command and entry["schema_hash"] == schema_hash:
+                    return entry
+        return None
+
+    def put(self, key, command, schema_hash, declarations):
+        with self._lock:
+            self._load_disk()
+            # 같은 서버의 이전 버전 항목과 실행 명령이 기록되지 않은 예전 형식 항목 제거
+            self._memory = {k: v for k, v in self._memory.items() if v.get("command") not in (None, command)}
+            self._memory[key] = {
+                "command": command,
+                "schema_hash": schema_hash,
+                "declarations": declarations,
+                "saved_at": time.time(),
+            }
+            self._save_disk()
+
+
+tool_declaration_cache = ToolDeclarationCache()
+
+
+def package_version(dist_name):
+    """
+    설치된 배포판의 버전 문자열. git에서 설치했으면 커밋 해시를 붙입니다. (설치되어 있지 않으면 "")
+    requirements.txt처럼 커밋을 고정해 설치하면 버전 번호는 그대로여도 커밋이 바뀌므로 함께 봅니다.
+    """
+    try:
+        dist = importlib.metadata.distribution(dist_name)
+    except importlib.metadata.PackageNotFoundError:
+        return ""
+    version = dist.version or ""
+    try:
+        direct_url = json.loads(dist.read_text("direct_url.json") or "{}")
+    except ValueError:
+        direct_url = {}
+    commit = direct_url.get("vcs_info", {}).get("commit_id")
+    return f"{version}+{commit[:12]}" if commit else version
+
+
+def file_version(path):
+    """스크립트로 띄우는 서버(mock 등)는 파일 내용 해시를 버전으로 씁니다."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:12]
+    except OSError:
+        return ""
+
+
+# ==========================================
+# KIPRIS 도구 호출 결과 캐시
+# ==========================================
+# 같은 제품 광고들에서 동일한 patent_search / patent_keyword_search 호출이 반복되므로
+# (서버 식별자, 도구 이름, 정규화된 인자)의 해시를 키로 결과를 보관합니다.
+# 메모리(LRU) -> 로컬 SQLite 순서로 조회하며, 둘 다 TTL이 지나면 버립니다.
+
+TOOL_RESULT_CACHE_TTL = int(os.getenv("KIPRIS_CACHE_TTL", str(24 * 60 * 60)))  # 초
+TOOL_RESULT_CACHE_SIZE = 512  # 메모리에 보관할 최대 항목 수
+TOOL_RESULT_CACHE_DISK_SIZE = 20000  # 디스크에 보관할 최대 항목 수
+TOOL_RESULT_CACHE_DB = os.getenv("KIPRIS_CACHE_DB", "kipris_cache.sqlite3")  # 빈 문자열이면 디스크 캐시 사용 안 함
+
+
+def _canonicalize(value):
+    """인자 표현 차이(키 순서, 1.0 vs 1, None 값)로 캐시 키가 달라지지 않도록 정규화합니다."""
+    if isinstance(value, dict):
+        return {str(k): _canonicalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+class ToolResultCache(TieredCache):
+    def __init__(self, db_path=TOOL_RESULT_CACHE_DB, ttl=TOOL_RESULT_CACHE_TTL,
+                 max_entries=TOOL_RESULT_CACHE_SIZE, max_disk_entries=TOOL_RESULT_CACHE_DISK_SIZE):
+        super().__init__(db_path, "tool_results", ttl, max_entries, max_disk_entries)
+
+    @staticmethod
+    def make_key(server_identity, name, arguments):
+        raw = json.dumps(
+            {"server": server_identity, "tool": name, "args": _canonicalize(arguments or {})},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+tool_result_cache = ToolResultCache()
+
 
 class MCPKVConnector:
-    def __init__(self, server_params: StdioServerParameters):
+    def __init__(self, server_params: StdioServerParameters, code_version=""):
         self.server_params = server_params
+        self.code_version = code_version  # 설치된 서버 코드 버전 (package_version / file_version)
         self.session = None
+        self.server_info = None
         self._exit_stack = None
 
     async def connect(self):
         self._exit_stack = AsyncExitStack()
         read_stream, write_stream = await self._exit_stack.enter_async_context(stdio_client(self.server_params))
         self.session = await self._exit_stack.enter_async_context(ClientSession(read_stream, write_stream))
-        await self.session.initialize()
+        init_result = await self.session.initialize()
+        self.server_info = init_result.serverInfo
         return self.session
 
+    def server_command(self):
+        """서버 실행 명령 (API 키가 들어 있는 env는 제외)"""
+        return " ".join([self.server_params.command, *self.server_params.args])
+
+    def server_identity(self):
+        """실행 명령 + 설치된 서버 코드 버전으로 서버를 식별합니다."""
+        return f"{self.server_command()}|{self.code_version}"
+
+    def _tool_cache_key(self):
+        name = self.server_info.name if self.server_info else ""
+        version = self.server_info.version if self.server_info else ""
+        return f"{self.server_identity()}|{name}|{version}"
+
     async def get_gemini_tools(self):
         if not self.session:
             await self.connect()
-        
-        tools = await self.session.list_tools()
-        gemini_tools = []
-        for tool in tools.tools:
-            # Map MCP tool schema to Gemini FunctionDeclaration
-            # Sanitize schema for Gemini compatibility
-            parameters = self._sanitize_schema(tool.inputSchema)
-            
-            declaration = types.FunctionDeclaration(
-                name=tool.name,
-                description=tool.description,
-                parameters=parameters
+
+        # 1. 캐시 적중 시 list_tools 왕복과 스키마 변환을 모두 생략
+        cache_key = self._tool_cache_key()
+        entry = tool_declaration_cache.get(cache_key)
+        if entry is None:
+            tools = await self.session.list_tools()
+            raw_tools = [tool.model_dump(mode="json") for tool in tools.tools]
+            schema_hash = hashlib.sha256(
+                json.dumps(raw_tools, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            ).hexdigest()
+
+            command = self.server_command()
+            entry = tool_declaration_cache.find_by_schema_hash(command, schema_hash)
+            if entry is not None:
+                declarations = entry["declarations"]
+            else:
+                # Map MCP tool schema to Gemini FunctionDeclaration
+                # Sanitize schema for Gemini compatibility
+                declarations = [
+                    {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "parameters": self._sanitize_schema(tool.inputSchema),
+                    }
+                    for tool in tools.tools
+                ]
+            tool_declaration_cache.put(cache_key, command, schema_hash, declarations)
+            entry = {"declarations": declarations}
+
+        return [
+            types.FunctionDeclaration(
+                name=d["name"],
+                description=d["description"],
+                parameters=d["parameters"]
             )
-            gemini_tools.append(declaration)
-        return gemini_tools
+            for d in entry["declarations"]
+        ]
 
     def _sanitize_schema(self, schema):
         """Sanitize JSON schema for Gemini compatibility."""
@@ -68,10 +257,22 @@ class MCPKVConnector:
         
         return new_schema
 
-    async def call_tool(self, name, arguments):
+    async def call_tool(self, name, arguments, use_cache=True):
         if not self.session:
             await self.connect()
-        return await self.session.call_tool(name, arguments)
+
+        cache_key = ToolResultCache.make_key(self.server_identity(), name, arguments) if use_cache else None
+        if cache_key:
+            cached = tool_result_cache.get(cache_key)
+            if cached is not None:
+                return CallToolResult.model_validate(cached)
+
+        result = await self.session.call_tool(name, arguments)
+
+        # 오류 결과는 캐시하지 않음
+        if cache_key and not result.isError:
+            tool_result_cache.put(cache_key, result.model_dump(mode="json"), tag=name)
+        return result
 
     async def disconnect(self):
         if self._exit_stack:
@@ -97,7 +298,7 @@ async def get_kipris_connector(use_mock=False):
             args=["mock_kipris_server.py"],
             env={**os.environ}
         )
-        return MCPKVConnector(server_params)
+        return MCPKVConnector(server_params, code_version=file_version("mock_kipris_server.py"))
 
     server_params = StdioServerParameters(
         command=sys.executable,
@@ -105,4 +306,219 @@ async def get_kipris_connector(use_mock=False):
         env={**os.environ, "KIPRIS_API_KEY": api_key}
     )
     
-    return MCPKVConnector(server_params)
+    return MCPKVConnector(server_params, code_version=package_version("mcp-kipris"))
+
+
+# ==========================================
+# 프로세스 공용 KIPRIS 커넥터 풀
+# ==========================================
+# 분석 요청마다 mcp_kipris 서브프로세스를 띄우고 내리는 대신, 연결된 세션을
+# 전용 이벤트 루프(백그라운드 스레드)에서 유지하며 여러 분석이 빌려 쓰도록 합니다.
+# stdio_client는 연결/종료가 같은 task에서 이뤄져야 하므로 세션마다 전용 task가
+# connect -> 종료 신호 대기 -> disconnect 를 담당합니다.
+
+KIPRIS_POOL_SIZE = int(os.getenv("KIPRIS_POOL_SIZE", "4"))
+HEALTH_CHECK_INTERVAL = 30.0  # 이 시간(초) 이상 쉬었던 세션은 빌려주기 전에 ping으로 확인
+HEALTH_CHECK_TIMEOUT = 5.0
+
+# 연결이 끊어졌을 때 발생하는 예외 (이 경우 세션을 새로 연결하고 한 번 재시도)
+try:
+    import anyio
+    CONNECTION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+                         ConnectionError, EOFError)
+except ImportError:
+    CONNECTION_ERRORS = (ConnectionError, EOFError)
+
+
+class _PooledSession:
+    """풀이 관리하는 연결된 MCPKVConnector 하나"""
+
+    def __init__(self, connector):
+        self.connector = connector
+        self.stop_event = asyncio.Event()
+        self.task = None
+        self.last_used = time.monotonic()
+
+
+class KiprisConnectorLease:
+    """
+    풀에서 빌린 세션. MCPKVConnector와 같은 get_gemini_tools / call_tool 을 제공하며
+    어느 이벤트 루프에서 호출해도 실제 작업은 풀의 루프에서 실행됩니다.
+    """
+
+    def __init__(self, pool, pooled):
+        self._pool = pool
+        self._pooled = pooled
+        self._reconnect_lock = None  # 풀의 이벤트 루프에서 생성
+        self.broken = False
+
+    async def get_gemini_tools(self):
+        return await self._pool._run(self._pool._with_reconnect(self, lambda c: c.get_gemini_tools()))
+
+    async def call_tool(self, name, arguments):
+        return await self._pool._run(self._pool._with_reconnect(self, lambda c: c.call_tool(name, arguments)))
+
+
+class KiprisConnectorPool:
+    """
+    연결된 KIPRIS MCP 세션 풀 (헬스 체크, 자동 재연결, 동시 세션 수 제한)
+
+    사용법:
+        async with get_kipris_pool().session() as connector:
+            tools = await connector.get_gemini_tools()
+    """
+
+    def __init__(self, max_sessions=KIPRIS_POOL_SIZE, use_mock=False):
+        self.max_sessions = max_sessions
+        self.use_mock = use_mock
+        self._idle = []
+        self._semaphore = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="kipris-pool", daemon=True)
+        self._thread.start()
+        self._run_sync(self._init_on_loop())
+
+    async def _init_on_loop(self):
+        self._semaphore = asyncio.Semaphore(self.max_sessions)
+
+    def _run_sync(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _run(self, coro):
+        """풀의 이벤트 루프에서 coro를 실행하고 결과를 현재 루프에서 기다립니다."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    # --- 아래 메서드는 모두 풀의 이벤트 루프에서 실행됩니다 ---
+
+    async def _open(self):
+        connector = await get_kipris_connector(use_mock=self.use_mock)
+        pooled = _PooledSession(connector)
+        ready = self._loop.create_future()
+
+        async def owner():
+            try:
+                await connector.connect()
+            except Exception as e:
+                ready.set_exception(e)
+                return
+            ready.set_result(None)
+            try:
+                await pooled.stop_event.wait()
+            finally:
+                await connector.disconnect()
+
+        pooled.task = asyncio.create_task(owner())
+        await ready
+        return pooled
+
+    async def _close(self, pooled):
+        pooled.stop_event.set()
+        try:
+            await pooled.task
+        except Exception as e:
+            print(f"로그: KIPRIS 세션 종료 중 오류 (무시): {e}")
+
+    async def _is_healthy(self, pooled):
+        if pooled.task.done():
+            return False
+        if time.monotonic() - pooled.last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            await asyncio.wait_for(pooled.connector.session.send_ping(), HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self):
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                pooled = self._idle.pop()
+                if await self._is_healthy(pooled):
+                    return pooled
+                print("로그: 응답하지 않는 KIPRIS 세션을 폐기합니다.")
+                await self._close(pooled)
+            print("로그: 새 KIPRIS MCP 세션을 연결합니다.")
+            return await self._open()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def _release(self, lease):
+        try:
+            if lease.broken or lease._pooled.task.done():
+                await self._close(lease._pooled)
+            else:
+                lease._pooled.last_used = time.monotonic()
+                self._idle.append(lease._pooled)
+        finally:
+            self._semaphore.release()
+
+    async def _with_reconnect(self, lease, action):
+        pooled = lease._pooled
+        try:
+            result = await action(pooled.connector)
+        except CONNECTION_ERRORS as e:
+            # 같은 lease에서 동시에 실행 중인 호출들이 함께 실패해도 재연결은 한 번만
+            if lease._reconnect_lock is None:
+                lease._reconnect_lock = asyncio.Lock()
+            async with lease._reconnect_lock:
+                if lease._pooled is pooled:
+                    print(f"로그: KIPRIS 세션 연결이 끊어져 재연결합니다: {e!r}")
+                    await self._close(pooled)
+                    lease._pooled = await self._open()
+            result = await action(lease._pooled.connector)
+        lease._pooled.last_used = time.monotonic()
+        return result
+
+    async def _close_all(self):
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._close(pooled)
+
+    # --- 공개 API (어느 이벤트 루프에서든 호출 가능) ---
+
+    async def acquire(self):
+        pooled = await self._run(self._acquire())
+        return KiprisConnectorLease(self, pooled)
+
+    async def release(self, lease):
+        await self._run(self._release(lease))
+
+    @asynccontextmanager
+    async def session(self):
+        lease = await self.acquire()
+        try:
+            yield lease
+        except CONNECTION_ERRORS:
+            lease.broken = True
+            raise
+        finally:
+            await self.release(lease)
+
+    def close(self, timeout=10):
+        """유휴 세션을 모두 종료합니다. (프로세스 종료 시 자동 호출)"""
+        if self._loop.is_running():
+            try:
+                self._run_sync(self._close_all(), timeout)
+            except Exception as e:
+                print(f"로그: KIPRIS 풀 종료 중 오류 (무시): {e}")
+
+
+_kipris_pool = None
+_kipris_pool_lock = threading.Lock()
+
+def get_kipris_pool():
+    """프로세스 전체에서 공유하는 KIPRIS 커넥터 풀을 반환합니다."""
+    global _kipris_pool
+    with _kipris_pool_lock:
+        if _kipris_pool is None:
+            _kipris_pool = KiprisConnectorPool()
+            atexit.register(_kipris_pool.close)
+        return _kipris_pool
@@ -0,0 +1,79 @@
+"""
+NPRDetector 전처리 벤치마크: 기존 torchvision(PIL) 경로 vs PIL 없는 고속 경로
+
+사용법:
+    python benchmark_preprocess.py                         # 임의의 crop으로 측정
+    python benchmark_preprocess.py --video path/to/video.mp4 --batch 16
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+import torch
+
+from npr_wrapper import NPRDetector
+
+
+def load_frames(video_path, count):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < count and cap.grab():
+        success, frame = cap.retrieve()
+        if not success:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def random_frames(count, seed=0):
+    # 얼굴 crop 크기 분포를 흉내내기 위해 다양한 해상도 사용
+    rng = np.random.default_rng(seed)
+    sizes = [(180, 140), (320, 260), (480, 400), (720, 640), (1080, 1920)]
+    return [rng.integers(0, 256, size=(*sizes[i % len(sizes)], 3), dtype=np.uint8) for i in range(count)]
+
+
+def timeit(fn, repeat):
+    fn()  # warm-up
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", default=None)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.batch) if args.video else random_frames(args.batch)
+    if not frames:
+        print("프레임을 읽지 못했습니다.")
+        return
+
+    detector = NPRDetector()
+
+    t_pil = timeit(lambda: detector.preprocess_batch_pil(frames), args.repeat)
+    t_fast = timeit(lambda: detector.preprocess_batch(frames), args.repeat)
+    print(f"[전처리] PIL: {t_pil * 1000:.2f} ms / 고속: {t_fast * 1000:.2f} ms (x{t_pil / t_fast:.2f})")
+
+    detector.fast_preprocess = False
+    scores_pil = detector.predict_batch(frames)
+    detector.fast_preprocess = True
+    scores_fast = detector.predict_batch(frames)
+
+    max_diff = float(np.max(np.abs(scores_pil - scores_fast)))
+    print(f"[점수] 최대 차이: {max_diff:.5f} (허용 오차 {args.tolerance})")
+    print("✅ 일치" if max_diff <= args.tolerance else "❌ 허용 오차 초과")
+
+
+if __name__ == "__main__":
+    main()
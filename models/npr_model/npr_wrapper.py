@@ -1,9 +1,12 @@
 import torch
+import torch.nn.functional as F
 import cv2
+import numpy as np
 from PIL import Image
 import torchvision.transforms as transforms
 import sys
 import os
+import threading
 # 현재 파일의 디렉토리를 sys.path에 추가하여 networks 등을 임포트할 수 있게 함
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
@@ -11,8 +14,12 @@ if current_dir not in sys.path:
 
 from networks.resnet import resnet50 
 
+INPUT_SIZE = 224
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+
 class NPRDetector:
-    def __init__(self, model_filename="NPR.pth"):
+    def __init__(self, model_filename="NPR.pth", fast_preprocess=True):
         # 1. 장치 설정 (GPU/CPU)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
@@ -49,30 +56,86 @@ class NPRDetector:
 
         # 5. 전처리 설정 (NPR 표준 규격)
         self.transform = transforms.Compose([
-            transforms.Resize((224, 224)),
+            transforms.Resize((INPUT_SIZE, INPUT_SIZE)),
             transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+            transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD),
         ])
 
+        # 6. PIL 없는 고속 전처리 설정
+        # BGR->RGB 채널 교환 + /255 + Normalize 를 1x1 conv 하나로 합침
+        #   out[c] = x[2-c] / (255 * std[c]) - mean[c] / std[c]
+        self.fast_preprocess = fast_preprocess
+        weight = torch.zeros(3, 3, 1, 1)
+        for c in range(3):
+            weight[c, 2 - c, 0, 0] = 1.0 / (255.0 * IMAGENET_STD[c])
+        bias = torch.tensor([-m / s for m, s in zip(IMAGENET_MEAN, IMAGENET_STD)])
+        self._norm_weight = weight.to(self.device)
+        self._norm_bias = bias.to(self.device)
+        # analyze()가 여러 스레드(Flask 요청, 추출 작업 스레드)에서 동시에 호출되므로 버퍼는 스레드별로 둠
+        self._local = threading.local()
+
     def predict_image(self, cv2_frame):
         
       #  [수정 포인트] 파일 경로가 아닌, 메모리 상의 이미지(cv2_frame)를 직접 받습니다.
        
+        return float(self.predict_batch([cv2_frame])[0])
+
+    def predict_batch(self, cv2_frames):
+        """
+        여러 장의 이미지(BGR)를 하나의 텐서로 묶어 한 번의 forward로 추론합니다.
+
+        Returns:
+        - 각 이미지의 0~1 확률값(점수) 벡터 (numpy 배열, 입력 순서 유지)
+        """
+        if len(cv2_frames) == 0:
+            return np.zeros(0, dtype=np.float32)
+
         try:
-            # OpenCV의 BGR 형식을 PIL의 RGB 형식으로 변환
-            color_converted = cv2.cvtColor(cv2_frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(color_converted)
-            
-            # 전처리 적용
-            img_t = self.transform(img).unsqueeze(0).to(self.device)
+            if self.fast_preprocess:
+                batch = self.preprocess_batch(cv2_frames)
+            else:
+                batch = self.preprocess_batch_pil(cv2_frames)
 
             with torch.no_grad():
-                # 모델 추론
-                output = self.model(img_t)
-                # 0~1 사이의 확률값(점수) 반환
-                prob = torch.sigmoid(output).item()
-            
-            return prob
+                # 모델 추론 (배치 전체에 대해 sync는 마지막에 한 번만)
+                output = self.model(batch)
+                probs = torch.sigmoid(output).flatten()
+
+            return probs.cpu().numpy()
         except Exception as e:
             print(f"Prediction Error: {e}")
-            return 0.5 # 에러 발생 시 중립적인 점수 반환
\ No newline at end of file
+            return np.full(len(cv2_frames), 0.5, dtype=np.float32) # 에러 발생 시 중립적인 점수 반환
+
+    def preprocess_batch(self, cv2_frames):
+        """
+        PIL 없이 NumPy/torch만으로 전처리합니다. (BGR uint8 -> 정규화된 RGB 텐서)
+
+        cv2.resize 결과를 미리 할당된 (스레드별) 배치 버퍼에 바로 쓰고, 채널 교환과
+        mean/std 정규화는 디바이스에서 한 번의 연산으로 처리합니다.
+        """
+        n = len(cv2_frames)
+        buffer = getattr(self._local, "batch_buffer", None)
+        if buffer is None or buffer.shape[0] < n:
+            buffer = np.empty((n, INPUT_SIZE, INPUT_SIZE, 3), dtype=np.uint8)
+            self._local.batch_buffer = buffer
+        buffer = buffer[:n]
+
+        for slot, frame in zip(buffer, cv2_frames):
+            h, w = frame.shape[:2]
+            # 축소 시에는 INTER_AREA가 torchvision(antialias) 결과와 가장 가깝습니다.
+            interpolation = cv2.INTER_AREA if (h > INPUT_SIZE or w > INPUT_SIZE) else cv2.INTER_LINEAR
+            cv2.resize(frame, (INPUT_SIZE, INPUT_SIZE), dst=slot, interpolation=interpolation)
+
+        # CPU에서는 from_numpy/.to가 버퍼 메모리를 그대로 공유하므로, 반환 전에 .float()로
+        # 새 텐서에 복사해서 돌려주는 텐서가 버퍼를 참조하지 않도록 함
+        x = torch.from_numpy(buffer).to(self.device)
+        x = x.permute(0, 3, 1, 2).float()
+        return F.conv2d(x, self._norm_weight, self._norm_bias)
+
+    def preprocess_batch_pil(self, cv2_frames):
+        """기존 torchvision(PIL) 전처리 경로 (비교/검증용)"""
+        # OpenCV의 BGR 형식을 PIL의 RGB 형식으로 변환 후 전처리, 배치로 쌓기
+        return torch.stack([
+            self.transform(Image.fromarray(cv2.cvtColor(f, cv2.COLOR_BGR2RGB)))
+            for f in cv2_frames
+        ]).to(self.device)
@@ -0,0 +1,395 @@
+import os
+import threading
+
+import cv2
+
+from frame_sampler import FrameSampler
+from frame_writer import FrameWriter, parse_save_mode, THUMBNAIL_SIZE
+from face_tracker import FaceTracker, DETECT_INTERVAL
+from adaptive_sampling import (ADAPTIVE_CONFIDENCE, ADAPTIVE_STRIDE, DECISION_RATE, LOOK_EVERY, MAX_FRAMES,
+                               plan_refinement, sequential_test)
+from shot_sampler import (ShotSampler, aggregate_shots, suspected_segments, SCENE_CUT_THRESHOLD, SHOT_MAX_GAP,
+                          SHOT_SAMPLE_GAP, SHOT_SAMPLES)
+
+# ==========================================
+# NPR 영상 분석 엔진
+# ==========================================
+# /analyze/npr 라우트와 /extract 작업이 함께 사용하는 분석 로직입니다.
+# 샘플링 -> 얼굴 검출/crop -> 마이크로 배치 NPR 추론 -> 집계까지 한 프로세스 안에서 처리하고
+# dict 결과를 돌려줍니다. (Flask test_client로 라우트를 다시 호출하지 않음)
+
+NPR_BATCH_SIZE = 16    # 한 번에 추론할 crop 수
+FAKE_THRESHOLD = 0.5   # 이 점수를 넘으면 AI 생성 프레임으로 판정
+DETECT_MAX_SIDE = 640  # 얼굴 검출용 축소본의 긴 변 길이(px). 0이면 원본 해상도로 검출
+MAX_FACES = 8          # face_mode="all"에서 한 프레임당 점수를 매길 최대 얼굴 수
+
+SAMPLE_STRATEGIES = ("stride", "fps", "keyframe", "adaptive", "shot")
+FACE_MODES = ("primary", "all")
+NO_FACE_FALLBACKS = ("frame", "skip")
+
+DEFAULT_OPTIONS = {
+    "sample_strategy": "stride",  # "stride" | "fps" | "keyframe" | "adaptive" | "shot"
+    "sample_stride": 10,
+    "sample_fps": 2.0,
+    "batch_size": NPR_BATCH_SIZE,
+    "save_frames": "none",        # "none" | "full" | "face" | "thumbnail" (frames_ai / frames_real 폴더)
+    "thumbnail_size": THUMBNAIL_SIZE,
+    "face_detect_interval": DETECT_INTERVAL,  # 샘플 K개마다 얼굴 검출, 사이에는 추적 (1이면 매 샘플 검출)
+    "detect_max_side": DETECT_MAX_SIDE,
+    "threshold": FAKE_THRESHOLD,
+    "face_mode": "primary",       # "primary": 첫 번째 얼굴만 | "all": 기준을 넘는 모든 얼굴을 한 배치로 추론
+    "min_face_confidence": 0.5,   # face_mode="all"에서 사용할 최소 검출 확신도
+    "min_face_size": 24,          # face_mode="all"에서 사용할 최소 얼굴 크기 (원본 기준 짧은 변, px)
+    "no_face_fallback": "frame",  # 얼굴이 없을 때 "frame": 전체 프레임 추론 | "skip": 추론하지 않음
+    # sample_strategy="adaptive" 전용
+    "adaptive_stride": ADAPTIVE_STRIDE,          # 첫 단계 샘플 간격(프레임)
+    "adaptive_confidence": ADAPTIVE_CONFIDENCE,  # 이 신뢰도에 도달하면 조기 종료
+    "decision_rate": DECISION_RATE,              # AI 프레임 비율 판정 기준
+    "adaptive_max_frames": MAX_FRAMES,           # 분석할 최대 샘플 수
+    # sample_strategy="shot" 전용
+    "scene_cut_threshold": SCENE_CUT_THRESHOLD,  # 장면 전환 판단 기준 (축소 흑백 프레임 평균 차이)
+    "shot_samples": SHOT_SAMPLES,                # 샷마다 촘촘히 볼 샘플 수
+    "shot_sample_gap": SHOT_SAMPLE_GAP,          # 샷 안에서 샘플 간격(프레임)
+    "shot_max_gap": SHOT_MAX_GAP,                # 긴 샷에서 샘플을 다 채운 뒤의 간격(프레임)
+}
+
+
+def parse_options(data):
+    """
+    요청 JSON 등에서 분석 옵션을 읽어 타입을 맞춥니다. 없는 값은 DEFAULT_OPTIONS를 사용합니다.
+    """
+    data = data or {}
+    options = {key: data.get(key, default) for key, default in DEFAULT_OPTIONS.items()}
+    options["sample_stride"] = int(options["sample_stride"])
+    options["sample_fps"] = float(options["sample_fps"])
+    options["batch_size"] = max(int(options["batch_size"]), 1)
+    options["save_frames"] = parse_save_mode(options["save_frames"])
+    options["thumbnail_size"] = max(int(options["thumbnail_size"]), 16)
+    options["face_detect_interval"] = max(int(options["face_detect_interval"]), 1)
+    options["detect_max_side"] = max(int(options["detect_max_side"]), 0)
+    options["min_face_confidence"] = float(options["min_face_confidence"])
+    options["min_face_size"] = max(int(options["min_face_size"]), 0)
+    options["adaptive_stride"] = max(int(options["adaptive_stride"]), 1)
+    options["adaptive_confidence"] = min(max(float(options["adaptive_confidence"]), 0.5), 0.9999)
+    options["decision_rate"] = float(options["decision_rate"])
+    options["adaptive_max_frames"] = max(int(options["adaptive_max_frames"]), 1)
+    options["scene_cut_threshold"] = float(options["scene_cut_threshold"])
+    options["shot_samples"] = max(int(options["shot_samples"]), 1)
+    options["shot_sample_gap"] = max(int(options["shot_sample_gap"]), 1)
+    options["shot_max_gap"] = max(int(options["shot_max_gap"]), 1)
+    if options["sample_strategy"] not in SAMPLE_STRATEGIES:
+        raise ValueError(f"지원하지 않는 샘플링 방식입니다: {options['sample_strategy']} "
+                         f"(가능: {', '.join(SAMPLE_STRATEGIES)})")
+    if options["face_mode"] not in FACE_MODES:
+        raise ValueError(f"지원하지 않는 face_mode입니다: {options['face_mode']} (가능: {', '.join(FACE_MODES)})")
+    if options["no_face_fallback"] not in NO_FACE_FALLBACKS:
+        raise ValueError(f"지원하지 않는 no_face_fallback입니다: {options['no_face_fallback']} "
+                         f"(가능: {', '.join(NO_FACE_FALLBACKS)})")
+    options["threshold"] = float(options["threshold"])
+    return options
+
+
+class NPRVideoAnalyzer:
+    """
+    Parameters:
+    - detector: NPRDetector 인스턴스 (predict_batch 사용)
+    - face_detection: MediaPipe FaceDetection 인스턴스
+
+    analyze()는 여러 스레드(Flask 요청, 작업 큐 워커)에서 호출될 수 있습니다.
+    MediaPipe 그래프는 동시에 process()를 호출하면 안 되므로 얼굴 검출만 잠금으로 보호합니다.
+    """
+
+    def __init__(self, detector, face_detection):
+        self.detector = detector
+        self.face_detection = face_detection
+        self._face_lock = threading.Lock()
+
+    @staticmethod
+    def detection_input(frame, max_side=DETECT_MAX_SIDE):
+        """
+        검출기에 넣을 RGB 축소본을 만듭니다. (MediaPipe 입력은 192x192라 원본 해상도가 필요 없음)
+        축소 후에 색 변환을 하므로 1080p/4K 원본 전체를 변환하지 않습니다.
+        """
+        h, w = frame.shape[:2]
+        if max_side and max(h, w) > max_side:
+            scale = max_side / max(h, w)
+            frame = cv2.resize(frame, (max(round(w * scale), 1), max(round(h * scale), 1)),
+                               interpolation=cv2.INTER_LINEAR)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def detect_faces(self, frame, max_side=DETECT_MAX_SIDE, all_faces=False, min_confidence=0.0, min_size=0):
+        """
+        얼굴 목록 [(상대 좌표 박스 (xmin, ymin, width, height), 확신도), ...]을 반환합니다.
+        축소본에서 검출해도 상대 좌표는 같으므로 crop_face()로 원본에서 바로 잘라낼 수 있습니다.
+
+        - all_faces=False: 첫 번째로 검출된 얼굴 하나만 (기존 동작, 필터 없음)
+        - all_faces=True: 확신도 min_confidence 이상, 원본 기준 짧은 변 min_size px 이상인 얼굴을
+          확신도 순으로 최대 MAX_FACES개
+        """
+        frame_rgb = self.detection_input(frame, max_side)
+        with self._face_lock:
+            face_results = self.face_detection.process(frame_rgb)
+
+        faces = []
+        ih, iw = frame.shape[:2]
+        for det in face_results.detections or []:
+            bbox = det.location_data.relative_bounding_box
+            confidence = float(det.score[0]) if det.score else 0.0
+            box = (bbox.xmin, bbox.ymin, bbox.width, bbox.height)
+            if not all_faces:
+                return [(box, confidence)]
+            if confidence >= min_confidence and min(bbox.width * iw, bbox.height * ih) >= min_size:
+                faces.append((box, confidence))
+        faces.sort(key=lambda face: face[1], reverse=True)
+        return faces[:MAX_FACES]
+
+    @staticmethod
+    def crop_face(frame, bbox):
+        """박스가 없으면 전체 프레임, crop이 비면 None (기존 동작과 동일)"""
+        if bbox is None:
+            return frame
+        ih, iw, _ = frame.shape
+        x = int(bbox[0] * iw)
+        y = int(bbox[1] * ih)
+        w = int(bbox[2] * iw)
+        h = int(bbox[3] * ih)
+        face_img = frame[max(0, y):y+h, max(0, x):x+w]
+        return face_img if face_img.size > 0 else None
+
+    def analyze(self, video_path, options=None):
+        """
+        영상 하나를 분석합니다.
+
+        Parameters:
+        - video_path: 분석할 영상 경로
+        - options: parse_options() 형식의 dict (생략 시 기본값)
+
+        Returns:
+        - {"ai_detected_frames", "ai_generation_rate", "analyzed_frames", "scored_frames", "total_frames",
+           "saved_frames", "face_tracking", "options"}
+          sample_strategy="adaptive"이면 판정/도달 신뢰도/사용 프레임 수를 담은 "adaptive"가 추가됩니다.
+          sample_strategy="shot"이면 샷별 점수 "shots"와 AI 의심 시간 범위 "suspected_segments"가 추가됩니다.
+          face_mode="all"이면 프레임별 얼굴 점수와 max/mean을 담은 "frames"가 추가됩니다.
+          (프레임 판정은 얼굴 점수 중 최댓값 기준)
+        """
+        if not video_path or not os.path.exists(video_path):
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {video_path}")
+        options = parse_options(options)
+
+        adaptive = options["sample_strategy"] == "adaptive"
+        if adaptive:
+            # 첫 단계는 성긴 간격으로 앞에서부터 순서대로
+            sampler = FrameSampler(video_path, strategy="stride", stride=options["adaptive_stride"])
+        elif options["sample_strategy"] == "shot":
+            sampler = ShotSampler(
+                video_path,
+                scene_cut_threshold=options["scene_cut_threshold"],
+                samples_per_shot=options["shot_samples"],
+                sample_gap=options["shot_sample_gap"],
+                max_gap=options["shot_max_gap"],
+            )
+        else:
+            sampler = FrameSampler(
+                video_path,
+                strategy=options["sample_strategy"],
+                stride=options["sample_stride"],
+                frames_per_second=options["sample_fps"],
+            )
+        total_frames = sampler.total_frames
+        threshold = options["threshold"]
+        all_faces = options["face_mode"] == "all"
+        fake_frame_count = 0
+        analyzed_count = 0
+        scored_count = 0
+        frame_reports = []
+        frame_scores = {}  # frame_index -> 프레임 점수 (얼굴 점수 중 최댓값)
+
+        print(f"분석 시작: {video_path} (총 {total_frames} 프레임, 샘플링: {options['sample_strategy']})")
+
+        # 프레임 저장은 요청한 경우에만, 별도 스레드에서 처리 (추론 루프가 JPEG 인코딩/디스크 쓰기를 기다리지 않음)
+        writer = None
+        if options["save_frames"] != "none":
+            writer = FrameWriter(os.path.dirname(video_path), mode=options["save_frames"],
+                                 thumbnail_size=options["thumbnail_size"])
+
+        tracker = FaceTracker(
+            lambda frame: self.detect_faces(frame, options["detect_max_side"], all_faces,
+                                            options["min_face_confidence"], options["min_face_size"]),
+            detect_interval=options["face_detect_interval"],
+        )
+
+        # 여러 프레임의 얼굴 crop을 모아서 한 번의 forward로 추론 (마이크로 배치)
+        pending = []  # (frame_index, 원본 frame, [추론 입력 or None], [(박스, 확신도) or None])
+
+        def flush_batch():
+            nonlocal fake_frame_count, scored_count
+            inputs = [crop for item in pending for crop in item[2] if crop is not None]
+            scores = iter(self.detector.predict_batch(inputs))
+
+            for i, frame, crops, faces in pending:
+                if not crops:
+                    continue  # 얼굴이 없고 no_face_fallback="skip"
+                # crop이 비어 있으면 추론하지 않고 0점 처리 (기존 동작 유지)
+                face_scores = [float(next(scores)) if crop is not None else 0.0 for crop in crops]
+                best = max(range(len(face_scores)), key=face_scores.__getitem__)
+                is_fake = face_scores[best] > threshold
+                scored_count += 1
+                frame_scores[i] = face_scores[best]
+                if is_fake:
+                    fake_frame_count += 1
+
+                if all_faces:
+                    frame_reports.append({
+                        "frame": i,
+                        "time": round(i / sampler.fps, 3),
+                        "faces": [
+                            {"bbox": [round(v, 4) for v in face[0]] if face else None,
+                             "confidence": round(face[1], 4) if face else None,
+                             "score": round(score, 4)}
+                            for face, score in zip(faces, face_scores)
+                        ],
+                        "max_score": round(face_scores[best], 4),
+                        "mean_score": round(sum(face_scores) / len(face_scores), 4),
+                        "is_fake": is_fake,
+                    })
+
+                if writer is not None:
+                    writer.submit(i, is_fake, frame, crops[best])
+            pending.clear()
+
+        def run_pass(frames, look_every=None, should_stop=None):
+            """
+            frames를 분석합니다. look_every 샘플마다 지금까지 결과로 should_stop()을 확인하고
+            True면 디코딩을 멈춥니다. (중단했으면 True 반환)
+            """
+            nonlocal analyzed_count
+            tracker.reset()
+            since_look = 0
+            for i, frame in frames:
+                analyzed_count += 1
+                since_look += 1
+                faces = tracker.locate(frame)
+                if faces:
+                    crops = [self.crop_face(frame, bbox) for bbox, _ in faces]
+                elif options["no_face_fallback"] == "frame":
+                    crops, faces = [frame], [None]
+                else:
+                    crops = []
+                pending.append((i, frame, crops, faces))
+                # batch_size는 프레임 수가 아니라 한 번에 추론할 crop 수 기준
+                look_now = look_every is not None and since_look >= look_every
+                if look_now or sum(len(item[2]) for item in pending) >= options["batch_size"]:
+                    flush_batch()
+                if look_now:
+                    since_look = 0
+                    if should_stop():
+                        return True
+
+            if pending:
+                flush_batch()
+            return False
+
+        adaptive_report = None
+        try:
+            if not adaptive:
+                # seek 없이 한 번만 순차 디코딩하면서 샘플 프레임만 받아옴
+                run_pass(sampler)
+            else:
+                adaptive_report = self._run_adaptive(video_path, options, sampler, frame_scores, run_pass)
+        finally:
+            saved_frames = writer.close() if writer is not None else None
+
+        ai_rate = (fake_frame_count / scored_count) * 100 if scored_count > 0 else 0
+        if adaptive_report is not None:
+            # 촘촘히 추가한 구간이 비율을 왜곡하지 않도록 샘플이 대표하는 구간 길이로 가중한 비율 사용
+            ai_rate = adaptive_report["fake_rate"] * 100
+
+        shot_reports = None
+        if isinstance(sampler, ShotSampler):
+            shot_reports = aggregate_shots(sampler.shots, frame_scores, threshold, sampler.fps)
+            # 샷마다 샘플 수가 다르므로 프레임 수 대신 의심 샷이 차지하는 길이 비율 사용
+            scored_length = sum(shot["end_frame"] - shot["start_frame"] + 1
+                                for shot in shot_reports if shot["is_fake"] is not None)
+            fake_length = sum(shot["end_frame"] - shot["start_frame"] + 1 for shot in shot_reports if shot["is_fake"])
+            ai_rate = fake_length / scored_length * 100 if scored_length > 0 else 0
+
+        results = {
+            "ai_detected_frames": fake_frame_count,
+            "ai_generation_rate": f"{round(ai_rate, 2)}%",
+            "analyzed_frames": analyzed_count,
+            "scored_frames": scored_count,
+            "total_frames": total_frames,
+            "saved_frames": saved_frames,
+            "face_tracking": tracker.stats(),
+            "options": options,
+        }
+        if adaptive_report is not None:
+            results["adaptive"] = adaptive_report
+        if shot_reports is not None:
+            results["shots"] = shot_reports
+            results["suspected_segments"] = suspected_segments(shot_reports)
+        if all_faces:
+            results["frames"] = frame_reports
+        return results
+
+    @staticmethod
+    def _run_adaptive(video_path, options, sampler, frame_scores, run_pass):
+        """
+        적응형 샘플링: 성긴 순차 샘플링 중 판정이 나면 바로 멈추고, 끝까지 봐도 판정이 안 나면
+        불확실한 구간에만 샘플을 추가합니다. (adaptive_sampling 모듈 참고)
+        """
+        threshold = options["threshold"]
+        max_frames = options["adaptive_max_frames"]
+        looks = 0
+        verdict = {"decision": None, "rate": 0.0, "confidence": 0.0, "samples": 0}
+        attempted = set()  # 얼굴이 없어 건너뛴 프레임도 다시 고르지 않도록
+
+        def check():
+            nonlocal looks, verdict
+            looks += 1
+            verdict = sequential_test(frame_scores, threshold, looks, options["decision_rate"],
+                                      options["adaptive_confidence"])
+            return verdict["decision"] is not None or len(frame_scores) >= max_frames
+
+        def tracked(frames):
+            for i, frame in frames:
+                attempted.add(i)
+                yield i, frame
+
+        # 성긴 단계가 영상 끝까지 가기 전에 멈췄으면 stopped_early (판정이 났거나 프레임 예산 소진)
+        stopped_early = run_pass(tracked(sampler), LOOK_EVERY, check)
+        stopped_at_frame = max(attempted) if stopped_early and attempted else None
+        decoded_frames = sampler.decoded_frames
+        refined_frames = 0
+        if not stopped_early and not check() and len(frame_scores) < max_frames:
+            # 불확실 구간의 추가 프레임은 한 번에 골라 한 번의 디코딩으로 처리 (멀리 떨어진 프레임은 seek)
+            extra = plan_refinement(frame_scores, threshold, exclude=attempted,
+                                    limit=max_frames - len(frame_scores))
+            if extra:
+                refine_sampler = FrameSampler(video_path, strategy="indices", indices=extra)
+                run_pass(tracked(refine_sampler))
+                decoded_frames += refine_sampler.decoded_frames
+                refined_frames = len(extra)
+                check()
+
+        if verdict["decision"] is not None:
+            stop_reason = "decided"
+        elif len(frame_scores) >= max_frames:
+            stop_reason = "frame_budget"
+        else:
+            stop_reason = "undecided"
+
+        return {
+            "decision": verdict["decision"] or "undecided",
+            "fake_rate": round(verdict["rate"], 4),
+            "confidence_reached": round(verdict["confidence"], 4),
+            "target_confidence": options["adaptive_confidence"],
+            "decision_rate": options["decision_rate"],
+            "frames_used": len(frame_scores),
+            "frames_decoded": decoded_frames,
+            "stopped_early": stopped_early,
+            "stopped_at_frame": stopped_at_frame,
+            "stop_reason": stop_reason,
+            "looks": looks,
+            "refined_frames": refined_frames,
+        }
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+import orjson
+from flask.json.provider import JSONProvider
+
+# ==========================================
+# 공용 JSON 직렬화 (orjson)
+# ==========================================
+# Flask 응답, Extraction_<id> 산출물, 작업 결과 저장에서 같은 규칙으로 직렬화합니다.
+# numpy 배열/스칼라, datetime, UUID, dataclass, 문자열이 아닌 키는 orjson이 직접 처리하고,
+# 그 밖의 타입(set, Path, 임의 객체)만 default에서 변환합니다.
+# (기존 make_json_safe처럼 전체 객체를 재귀적으로 복사하지 않음)
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def _default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    # 알 수 없는 타입은 기존과 동일하게 문자열로 저장
+    return str(obj)
+
+
+def dumps(obj, pretty=False):
+    """
+    객체를 UTF-8 JSON bytes로 직렬화합니다.
+
+    Parameters:
+    - pretty: True면 2칸 들여쓰기 (사람이 열어볼 파일용)
+    """
+    option = OPTIONS | orjson.OPT_INDENT_2 if pretty else OPTIONS
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+def dumps_str(obj, pretty=False):
+    return dumps(obj, pretty).decode("utf-8")
+
+
+def loads(data):
+    return orjson.loads(data)
+
+
+def write_json(path, obj, pretty=False):
+    """JSON 파일을 임시 파일에 쓴 뒤 교체합니다. (읽는 쪽에서 반쯤 쓰인 파일을 보지 않도록)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dumps(obj, pretty))
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+class OrjsonProvider(JSONProvider):
+    """jsonify()와 request.get_json()을 orjson으로 처리하는 Flask JSON provider"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps_str(obj)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype="application/json")
@@ -0,0 +1,168 @@
+import cv2
+
+from face_tracker import scene_thumbnail, SCENE_CUT_THRESHOLD
+
+# ==========================================
+# 장면(샷) 단위 샘플링
+# ==========================================
+# 고정 간격 샘플링은 긴 정지 장면에서 비슷한 프레임을 여러 번 추론하고, 짧게 끼워 넣은
+# AI 생성 클립은 간격 사이에 끼어 놓칠 수 있습니다.
+# 순차 디코딩 중 몇 프레임마다 축소 흑백 프레임 차이로 장면 전환을 찾고,
+# 각 장면(샷)의 시작 프레임과 그 뒤 몇 프레임만 샘플링합니다.
+# 샷별로 NPR 점수를 모아 AI로 의심되는 구간(시간 범위)을 돌려줍니다.
+
+SCENE_CHECK_EVERY = 2    # 몇 프레임마다 장면 전환을 확인할지 (1이면 매 프레임)
+MIN_SHOT_FRAMES = 4      # 이보다 짧은 샷은 앞 샷에 합침 (빠른 움직임/디졸브로 인한 연속 전환 방지)
+SHOT_SAMPLES = 3         # 샷마다 촘촘히 볼 샘플 수
+SHOT_SAMPLE_GAP = 15     # 샷 안에서 샘플 간격(프레임)
+SHOT_MAX_GAP = 150       # SHOT_SAMPLES개를 채운 뒤에도 이 간격마다 한 장씩 (전환을 놓친 경우 대비)
+SHOT_FAKE_RATIO = 0.5    # 샷 샘플 중 AI 판정 비율이 이 이상이면 의심 구간
+
+
+class ShotSampler:
+    """
+    영상을 한 번만 순차적으로 읽으며 장면 전환을 찾고, 샷마다 몇 프레임만 돌려주는 이터레이터
+
+    Parameters:
+    - video_path: 분석할 영상 경로
+    - scene_cut_threshold: 축소 흑백 프레임 평균 밝기 차이(0~255)가 이 값을 넘으면 장면 전환
+    - check_every, min_shot_frames, samples_per_shot, sample_gap, max_gap: 위 상수 참고
+
+    Yields:
+    - (frame_index, frame) 튜플 (frame은 BGR numpy 배열)
+
+    반복이 끝나면 shots에 샷 구간 [(시작 프레임, 끝 프레임), ...] (끝 포함)이 남습니다.
+    """
+
+    def __init__(self, video_path, scene_cut_threshold=SCENE_CUT_THRESHOLD, check_every=SCENE_CHECK_EVERY,
+                 min_shot_frames=MIN_SHOT_FRAMES, samples_per_shot=SHOT_SAMPLES, sample_gap=SHOT_SAMPLE_GAP,
+                 max_gap=SHOT_MAX_GAP):
+        if check_every < 1 or sample_gap < 1 or max_gap < 1 or samples_per_shot < 1:
+            raise ValueError("check_every, sample_gap, max_gap, samples_per_shot는 1 이상이어야 합니다.")
+
+        self.video_path = video_path
+        self.scene_cut_threshold = float(scene_cut_threshold)
+        self.check_every = int(check_every)
+        self.min_shot_frames = max(int(min_shot_frames), 1)
+        self.samples_per_shot = int(samples_per_shot)
+        self.sample_gap = int(sample_gap)
+        self.max_gap = int(max_gap)
+        self.shots = []
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"영상을 열 수 없습니다: {video_path}")
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        cap.release()
+
+    def _next_sample(self, shot_start, last_sample, taken):
+        """이번 샷에서 다음 샘플을 뽑을 프레임 번호"""
+        if taken == 0:
+            return shot_start
+        return last_sample + (self.sample_gap if taken < self.samples_per_shot else self.max_gap)
+
+    def __iter__(self):
+        self.shots = []
+        cap = cv2.VideoCapture(self.video_path)
+        index = 0
+        shot_start = 0
+        last_sample = 0
+        taken = 0
+        prev_thumb = None
+        try:
+            while cap.grab():
+                check = index % self.check_every == 0
+                sample = index >= self._next_sample(shot_start, last_sample, taken)
+                if not (check or sample):
+                    index += 1
+                    continue
+
+                success, frame = cap.retrieve()
+                if not success:
+                    break
+
+                if check:
+                    thumb = scene_thumbnail(frame)
+                    cut = (prev_thumb is not None and index - shot_start >= self.min_shot_frames and
+                           float(cv2.absdiff(thumb, prev_thumb).mean()) > self.scene_cut_threshold)
+                    prev_thumb = thumb
+                    if cut:
+                        self.shots.append((shot_start, index - 1))
+                        shot_start, taken = index, 0
+                        sample = True
+
+                if sample:
+                    last_sample = index
+                    taken += 1
+                    yield index, frame
+                index += 1
+        finally:
+            cap.release()
+            if index > shot_start:
+                self.shots.append((shot_start, index - 1))
+
+
+def aggregate_shots(shots, frame_scores, threshold, fps, fake_ratio=SHOT_FAKE_RATIO):
+    """
+    샘플 프레임 점수를 샷 단위로 모읍니다.
+
+    Parameters:
+    - shots: [(시작 프레임, 끝 프레임), ...]
+    - frame_scores: {frame_index: score}
+    - threshold: 프레임 AI 판정 기준 점수
+
+    Returns:
+    - [{"shot", "start_frame", "end_frame", "start", "end", "samples", "fake_samples",
+        "mean_score", "max_score", "is_fake"}, ...]
+      점수가 하나도 없는 샷(얼굴이 없어 건너뜀)은 is_fake가 None
+    """
+    indices = sorted(frame_scores)
+    reports = []
+    pos = 0
+    for shot_id, (start, end) in enumerate(shots):
+        while pos < len(indices) and indices[pos] < start:
+            pos += 1
+        scores = []
+        while pos < len(indices) and indices[pos] <= end:
+            scores.append(frame_scores[indices[pos]])
+            pos += 1
+
+        fake = sum(score > threshold for score in scores)
+        reports.append({
+            "shot": shot_id,
+            "start_frame": start,
+            "end_frame": end,
+            "start": round(start / fps, 3),
+            "end": round((end + 1) / fps, 3),
+            "samples": len(scores),
+            "fake_samples": fake,
+            "mean_score": round(sum(scores) / len(scores), 4) if scores else None,
+            "max_score": round(max(scores), 4) if scores else None,
+            "is_fake": fake / len(scores) >= fake_ratio if scores else None,
+        })
+    return reports
+
+
+def suspected_segments(shot_reports):
+    """AI로 의심되는 샷 중 이어진 것끼리 합쳐 시간 범위 목록으로 돌려줍니다."""
+    segments = []
+    for shot in shot_reports:
+        if not shot["is_fake"]:
+            continue
+        last = segments[-1] if segments else None
+        if last is not None and last["end_frame"] + 1 == shot["start_frame"]:
+            last["end_frame"] = shot["end_frame"]
+            last["end"] = shot["end"]
+            last["shots"].append(shot["shot"])
+            last["max_score"] = max(last["max_score"], shot["max_score"])
+        else:
+            segments.append({
+                "start": shot["start"],
+                "end": shot["end"],
+                "start_frame": shot["start_frame"],
+                "end_frame": shot["end_frame"],
+                "shots": [shot["shot"]],
+                "max_score": shot["max_score"],
+            })
+    return segments
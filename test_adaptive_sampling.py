@@ -0,0 +1,67 @@
+from adaptive_sampling import plan_refinement, sample_weights, sequential_test, weighted_rate
+
+# adaptive_sampling의 순수 함수 단위 테스트 (python -m pytest test_adaptive_sampling.py)
+
+
+def test_sample_weights_uniform_and_dense():
+    assert sample_weights([0, 10, 20, 30]) == [10.0, 10.0, 10.0, 10.0]
+    # 촘촘히 추가한 샘플(15)은 대표 구간이 짧아 가중치가 작음
+    weights = sample_weights([0, 10, 15, 20, 30])
+    assert weights[2] < weights[0]
+    assert sample_weights([]) == []
+    assert sample_weights([5]) == [1.0]
+
+
+def test_weighted_rate_ignores_dense_refinement():
+    coarse = {0: 0.9, 10: 0.1, 20: 0.1, 30: 0.1}
+    rate, n_eff = weighted_rate(coarse, 0.5)
+    assert rate == 0.25
+    assert n_eff == 4
+    # 첫 구간만 촘촘히 봐도 전체 비율은 크게 변하지 않음
+    dense = {**coarse, 2: 0.9, 4: 0.9, 6: 0.9, 8: 0.9}
+    dense_rate, dense_n_eff = weighted_rate(dense, 0.5)
+    assert abs(dense_rate - 0.25) < 0.1
+    assert dense_n_eff < len(dense)
+
+
+def test_sequential_test_decides_clear_cases():
+    fake = {i * 30: 0.9 for i in range(16)}
+    real = {i * 30: 0.1 for i in range(16)}
+    assert sequential_test(fake, 0.5, look=1)["decision"] == "fake"
+    assert sequential_test(real, 0.5, look=1)["decision"] == "real"
+
+
+def test_sequential_test_needs_min_samples_and_stays_undecided_when_mixed():
+    few = {i * 30: 0.9 for i in range(4)}
+    assert sequential_test(few, 0.5, look=1)["decision"] is None
+    mixed = {i * 30: (0.9 if i % 2 else 0.1) for i in range(40)}
+    result = sequential_test(mixed, 0.5, look=1)
+    assert result["decision"] is None
+    assert result["rate"] == 0.5
+    assert result["samples"] == 40
+
+
+def test_sequential_test_confidence_drops_with_more_looks():
+    samples = {i * 30: (0.9 if i % 4 else 0.1) for i in range(16)}
+    first = sequential_test(samples, 0.5, look=1)["confidence"]
+    later = sequential_test(samples, 0.5, look=10)["confidence"]
+    assert later < first
+
+
+def test_plan_refinement_splits_uncertain_gaps_only():
+    samples = {0: 0.1, 40: 0.9, 80: 0.9, 120: 0.1}
+    # 0-40, 80-120은 판정이 엇갈리고 40-80은 둘 다 확실한 fake
+    assert plan_refinement(samples, 0.5, splits=3) == [10, 20, 30, 90, 100, 110]
+    assert plan_refinement(samples, 0.5, splits=1) == [20, 100]
+    assert plan_refinement({0: 0.1, 40: 0.1}, 0.5) == []
+    # 기준값 근처 점수도 불확실 구간
+    assert plan_refinement({0: 0.45, 40: 0.1}, 0.5, splits=1) == [20]
+
+
+def test_plan_refinement_limit_exclude_and_min_gap():
+    samples = {0: 0.1, 40: 0.9, 80: 0.9, 120: 0.1}
+    # 예산이 모자라면 구간마다 가운데 프레임부터
+    assert plan_refinement(samples, 0.5, splits=3, limit=2) == [20, 100]
+    assert plan_refinement(samples, 0.5, splits=1, exclude={20}) == [100]
+    assert plan_refinement({0: 0.1, 1: 0.9}, 0.5) == []
+    assert plan_refinement(samples, 0.5, limit=0) == []
@@ -0,0 +1,70 @@
+import os
+
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api.formatters import TextFormatter
+
+from cache_store import TieredCache
+
+# ==========================================
+# 자막 저장소 (영상별 캐시)
+# ==========================================
+# 같은 영상의 자막을 요청마다 다시 받지 않도록 (video_id, 언어 우선순위) 단위로
+# 원본 세그먼트와 TextFormatter 텍스트를 함께 보관합니다.
+# 메모리 LRU 위에 SQLite 저장소를 두고, 세그먼트는 [start, duration, text] 형태로 압축 저장합니다.
+
+TRANSCRIPT_CACHE_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", str(30 * 24 * 60 * 60)))  # 초
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "128"))  # 메모리 항목 수
+TRANSCRIPT_CACHE_DISK_SIZE = int(os.getenv("TRANSCRIPT_CACHE_DISK_SIZE", "20000"))
+TRANSCRIPT_CACHE_DB = os.getenv("TRANSCRIPT_CACHE_DB", "transcript_cache.sqlite3")  # 빈 문자열이면 디스크 캐시 사용 안 함
+
+transcript_cache = TieredCache(
+    TRANSCRIPT_CACHE_DB, "transcripts", TRANSCRIPT_CACHE_TTL, TRANSCRIPT_CACHE_SIZE, TRANSCRIPT_CACHE_DISK_SIZE
+)
+
+
+def _cache_key(video_id, languages):
+    # 언어 우선순위 순서가 다르면 다른 자막이 선택될 수 있으므로 순서를 유지한 채 키에 포함
+    return f"{video_id}|{','.join(languages) if languages else '*'}"
+
+
+def get_transcript(video_id, languages=None):
+    """
+    자막을 캐시에서 찾고, 없으면 YouTubeTranscriptApi로 받아 저장합니다.
+
+    Parameters:
+    - video_id: 유튜브 영상 ID
+    - languages: 원하는 언어 코드 우선순위 리스트 (예: ['ko', 'en']). None이면 기본 언어 사용
+
+    Returns:
+    - {"video_id", "languages", "language_code", "is_generated",
+       "segments": [{'text', 'start', 'duration'}, ...], "text": TextFormatter 결과}
+    """
+    key = _cache_key(video_id, languages)
+    entry = transcript_cache.get(key)
+
+    if entry is None:
+        ytt_api = YouTubeTranscriptApi()
+        if languages:
+            transcript = ytt_api.fetch(video_id, languages=languages)
+        else:
+            # 언어 지정 없이 자동으로 사용 가능한 자막 선택
+            transcript = ytt_api.fetch(video_id)
+
+        entry = {
+            "language_code": transcript.language_code,
+            "is_generated": transcript.is_generated,
+            "segments": [[s.start, s.duration, s.text] for s in transcript],
+            # 순수 텍스트로 변환하여 Gemini 분석에 최적화
+            "text": TextFormatter().format_transcript(transcript),
+        }
+        transcript_cache.put(key, entry, tag=video_id)
+
+    return {
+        "video_id": video_id,
+        "languages": languages,
+        "language_code": entry["language_code"],
+        "is_generated": entry["is_generated"],
+        "segments": [{"text": text, "start": start, "duration": duration}
+                     for start, duration, text in entry["segments"]],
+        "text": entry["text"],
+    }
@@ -1,10 +1,17 @@
 import pandas as pd
 from googleapiclient.discovery import build
+from googleapiclient.http import build_http
 import re
 import os
 import yt_dlp
-import json
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from frame_sampler import can_decode
+from extraction_manifest import ArtifactManifest
+from serialization import dumps, loads, read_json, write_json, JSONDecodeError
 
 # 1. API 키 설정 및 로드 함수
 API_KEY_FILE = 'api_key.txt'
@@ -28,89 +35,476 @@ def get_video_id(url):
         if match: return match.group(1)
     return None
 
-def collect_and_split_data(api_key, url, video_id):
-    """API 데이터와 yt-dlp 데이터를 각각 추출하여 개별 JSON으로 저장합니다."""
-    youtube = build('youtube', 'v3', developerKey=api_key)
-    
+# 다운로드 모드
+# - direct: OpenCV가 바로 디코딩할 수 있는 코덱(H.264 우선)을 골라 재인코딩 없이 remux만 수행
+# - transcode: 기존 방식. 항상 libx264/aac로 재인코딩
+DOWNLOAD_DIRECT = "direct"
+DOWNLOAD_TRANSCODE = "transcode"
+DOWNLOAD_MODE = os.getenv("DOWNLOAD_MODE", DOWNLOAD_DIRECT)
+
+# 다운로드 프로필
+# - analysis: NPR 프레임 분석 전용. 짧은 변이 MIN_SHORT_SIDE 이상인 가장 작은 영상 전용(오디오 없음) 포맷
+# - full: 기존 방식. 최고 화질 영상 + 오디오
+PROFILE_ANALYSIS = "analysis"
+PROFILE_FULL = "full"
+DOWNLOAD_PROFILE = os.getenv("DOWNLOAD_PROFILE", PROFILE_ANALYSIS)
+MIN_SHORT_SIDE = int(os.getenv("MIN_SHORT_SIDE", "480"))  # 얼굴 검출에 필요한 최소 해상도(짧은 변, px)
+
+# OpenCV(FFmpeg)에서 바로 디코딩하기 쉬운 순서
+CODEC_PREFERENCE = ("avc1", "vp9", "vp09", "av01")
+
+def _short_side(fmt):
+    return min(fmt.get('width') or 0, fmt.get('height') or 0)
+
+def _codec_rank(fmt):
+    vcodec = fmt.get('vcodec') or ""
+    for rank, prefix in enumerate(CODEC_PREFERENCE):
+        if vcodec.startswith(prefix):
+            return rank
+    return len(CODEC_PREFERENCE)
+
+def analysis_format_selector(min_short_side=MIN_SHORT_SIDE):
+    """
+    yt-dlp format 함수: 짧은 변이 min_short_side 이상인 영상 전용 포맷 중 가장 작은 것을 고릅니다.
+    조건을 만족하는 포맷이 없으면 가장 큰 해상도를 고릅니다.
+    """
+    def select(ctx):
+        formats = [f for f in ctx['formats'] if f.get('vcodec') not in (None, 'none')]
+        if not formats:
+            return
+        video_only = [f for f in formats if f.get('acodec') in (None, 'none')] or formats
+
+        candidates = [f for f in video_only if _short_side(f) >= min_short_side]
+        if candidates:
+            yield min(candidates, key=lambda f: (
+                _short_side(f), _codec_rank(f), f.get('filesize') or f.get('filesize_approx') or 0, f.get('tbr') or 0
+            ))
+        else:
+            yield max(video_only, key=lambda f: (_short_side(f), -_codec_rank(f)))
+    return select
+
+def build_ydl_opts(target_dir, download_mode=DOWNLOAD_DIRECT, download_profile=PROFILE_FULL):
+    """다운로드 모드/프로필에 맞는 yt-dlp 옵션을 만듭니다."""
+    ydl_opts = {
+        'outtmpl': os.path.join(target_dir, "video.%(ext)s"),
+        'writethumbnail': True,
+        'quiet': True,
+        'noplaylist': True,
+    }
+
+    if download_profile == PROFILE_ANALYSIS:
+        ydl_opts['format'] = analysis_format_selector()
+        if download_mode == DOWNLOAD_TRANSCODE:
+            ydl_opts.update({
+                'postprocessors': [{'key': 'FFmpegVideoConvertor', 'preferedformat': 'mp4'}],
+                'postprocessor_args': ['-c:v', 'libx264'],
+            })
+        return ydl_opts
+
+    if download_mode == DOWNLOAD_TRANSCODE:
+        ydl_opts.update({
+            'format': 'bv*+ba/best',
+            'merge_output_format': 'mp4',
+            'postprocessors': [
+                {
+                 'key': 'FFmpegVideoConvertor',
+                 'preferedformat': 'mp4',
+                }
+            ],
+            'postprocessor_args': [
+                '-c:v', 'libx264',
+                '-c:a', 'aac'
+            ],
+        })
+    else:
+        # H.264(+AAC) 조합을 우선 선택하고, 없으면 다른 코덱을 그대로 받음.
+        # 병합은 스트림 복사(remux)만 하며, mp4에 못 담는 조합이면 mkv로 저장
+        ydl_opts.update({
+            'format': (
+                'bv*[vcodec^=avc1]+ba[acodec^=mp4a]/'
+                'bv*[vcodec^=avc1]+ba/'
+                'b[vcodec^=avc1]/'
+                'bv*+ba/best'
+            ),
+            'merge_output_format': 'mp4/mkv',
+        })
+    return ydl_opts
+
+def ensure_decodable(target_dir):
+    """
+    받은 영상을 OpenCV가 디코딩하지 못할 때만 libx264로 재인코딩합니다.
+    최종 영상 파일명을 반환합니다.
+    """
+    video_name = find_video_file(target_dir)
+    if not video_name:
+        return None
+
+    video_path = os.path.join(target_dir, video_name)
+    if can_decode(video_path):
+        return video_name
+
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        print(f"⚠️ OpenCV가 디코딩할 수 없는 영상이지만 ffmpeg를 찾을 수 없어 변환하지 못했습니다: {video_name}")
+        return video_name
+
+    print(f"🔁 OpenCV 디코딩 불가 -> libx264로 재인코딩: {video_name}")
+    converted_path = os.path.join(target_dir, "transcoding_tmp.mp4")
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-i", video_path,
+         "-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac", converted_path],
+        check=True,
+    )
+    os.remove(video_path)
+    final_path = os.path.join(target_dir, "video.mp4")
+    os.replace(converted_path, final_path)
+    return "video.mp4"
+
+# discovery 문서 파싱은 비용이 크므로 API 키별로 프로세스당 한 번만 build
+_youtube_clients = {}
+_youtube_clients_lock = threading.Lock()
+_thread_local = threading.local()
+
+def get_youtube_client(api_key):
+    with _youtube_clients_lock:
+        client = _youtube_clients.get(api_key)
+        if client is None:
+            client = build('youtube', 'v3', developerKey=api_key)
+            _youtube_clients[api_key] = client
+        return client
+
+def execute_request(request):
+    """
+    공유 클라이언트의 요청을 실행합니다.
+    httplib2.Http는 스레드 안전하지 않으므로 스레드마다 별도의 Http 객체를 사용합니다.
+    (build_http로 만들어야 공유 클라이언트와 같은 기본 타임아웃(60초)이 적용되어 응답 없는 요청에 무한정 묶이지 않음)
+    """
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = build_http()
+        _thread_local.http = http
+    return request.execute(http=http)
+
+# 댓글 수집 한도
+COMMENTS_FILENAME = "comments.jsonl"
+COMMENT_LIMIT = int(os.getenv("COMMENT_LIMIT", "1000"))              # 최대 댓글 스레드 수
+COMMENT_QUOTA_BUDGET = int(os.getenv("COMMENT_QUOTA_BUDGET", "50"))  # commentThreads.list는 호출당 1 unit
+COMMENT_PAGE_SIZE = 100                                              # API 최대값
+
+def stream_comments(api_key, video_id, target_dir, max_comments=COMMENT_LIMIT, quota_budget=COMMENT_QUOTA_BUDGET):
+    """
+    commentThreads를 nextPageToken을 따라 수집하며 페이지마다 바로 JSONL에 기록합니다.
+    (한 줄 = 댓글 스레드 하나, 전체 응답을 메모리에 모아두지 않음)
+
+    max_comments 개수나 quota_budget(API 호출 수)에 도달하면 멈춥니다.
+    첫 페이지 요청이 실패하면 예외를 그대로 올리고, 이후 페이지에서 실패하면 그때까지 저장한 댓글로 마무리합니다.
+
+    Returns:
+    - 요약 dict: {"file", "count", "pages", "quota_used", "stopped_reason", "next_page_token"}
+    """
+    youtube = get_youtube_client(api_key)
+    out_path = os.path.join(target_dir, COMMENTS_FILENAME)
+    part_path = f"{out_path}.part"
+
+    count = 0
+    pages = 0
+    page_token = None
+    stopped_reason = "exhausted"
+
+    with open(part_path, 'wb') as f:
+        while True:
+            if count >= max_comments:
+                stopped_reason = "max_comments"
+                break
+            if pages >= quota_budget:
+                stopped_reason = "quota_budget"
+                break
+
+            params = {
+                "part": "snippet,replies",
+                "videoId": video_id,
+                "maxResults": min(COMMENT_PAGE_SIZE, max_comments - count),
+                "order": "relevance",
+            }
+            if page_token:
+                params["pageToken"] = page_token
+
+            try:
+                page = execute_request(youtube.commentThreads().list(**params))
+            except Exception as e:
+                if pages == 0:
+                    f.close()
+                    os.remove(part_path)
+                    raise
+                print(f"⚠️ 댓글 {pages + 1}페이지 수집 실패, 여기까지 저장합니다: {e}")
+                stopped_reason = "error"
+                break
+
+            pages += 1
+            for item in page.get("items", []):
+                f.write(dumps(item) + b"\n")
+                count += 1
+
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+
+    # 수집이 끝난 뒤에만 교체하여 이전 파일이 중간 상태로 덮이지 않도록 함
+    os.replace(part_path, out_path)
+    print(f"💬 댓글 {count}개 수집 ({pages}페이지, 종료 사유: {stopped_reason})")
+
+    return {
+        "file": COMMENTS_FILENAME,
+        "count": count,
+        "pages": pages,
+        "quota_used": pages,
+        "stopped_reason": stopped_reason,
+        "next_page_token": page_token if stopped_reason != "exhausted" else None,
+    }
+
+def iter_comments(target_dir):
+    """comments.jsonl의 댓글 스레드를 하나씩 읽어옵니다."""
+    path = os.path.join(target_dir, COMMENTS_FILENAME)
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+# yt-dlp 메타데이터
+# 분석에 쓰는 필드만 뽑은 요약본(data_ytdlp.json)을 항상 저장하고,
+# 모든 포맷 URL/조각 목록이 들어 있는 원본 덤프는 필요할 때만 zstd로 압축해 저장합니다.
+YTDLP_METADATA_FILENAME = "data_ytdlp.json"
+YTDLP_FULL_DUMP_FILENAME = "data_ytdlp_origin.json.zst"
+SAVE_FULL_YTDLP_DUMP = os.getenv("SAVE_FULL_YTDLP_DUMP", "false").lower() in ("1", "true", "yes")
+
+def project_ytdlp_info(info):
+    """
+    yt-dlp extract_info 결과에서 사용하는 필드만 골라 작은 dict로 만듭니다.
+
+    영상/오디오를 따로 받아 합친 경우 상위 필드가 비어 있을 수 있어 requested_formats에서 보완합니다.
+    """
+    requested = info.get('requested_formats') or []
+    video_fmt = next((f for f in requested if f.get('vcodec') not in (None, 'none')), info)
+    audio_fmt = next((f for f in requested if f.get('acodec') not in (None, 'none')), info)
+
+    return {
+        "id": info.get('id'),
+        "title": info.get('title'),
+        "uploader": info.get('uploader'),
+        "uploader_id": info.get('uploader_id'),
+        "channel": info.get('channel'),
+        "channel_id": info.get('channel_id'),
+        "upload_date": info.get('upload_date'),
+        "duration": info.get('duration'),
+        "fps": info.get('fps') or video_fmt.get('fps'),
+        "width": info.get('width') or video_fmt.get('width'),
+        "height": info.get('height') or video_fmt.get('height'),
+        "vcodec": video_fmt.get('vcodec'),
+        "acodec": audio_fmt.get('acodec'),
+        "format_id": info.get('format_id'),
+        "ext": info.get('ext'),
+        "filesize": info.get('filesize') or info.get('filesize_approx'),
+        "view_count": info.get('view_count'),
+        "like_count": info.get('like_count'),
+        "comment_count": info.get('comment_count'),
+        "channel_follower_count": info.get('channel_follower_count'),
+    }
+
+def save_ytdlp_metadata(target_dir, info, save_full_dump=SAVE_FULL_YTDLP_DUMP):
+    """
+    요약본을 저장하고, save_full_dump=True면 원본 덤프도 zstd 압축해 저장합니다.
+
+    Returns:
+    - (요약 dict, 저장한 파일명 리스트)
+    """
+    metadata = project_ytdlp_info(info)
+    write_json(os.path.join(target_dir, YTDLP_METADATA_FILENAME), metadata)
+    files = [YTDLP_METADATA_FILENAME]
+
+    full_dump_path = os.path.join(target_dir, YTDLP_FULL_DUMP_FILENAME)
+    if save_full_dump:
+        import zstandard
+
+        with open(full_dump_path, 'wb') as f:
+            f.write(zstandard.ZstdCompressor(level=10).compress(dumps(info)))
+        files.append(YTDLP_FULL_DUMP_FILENAME)
+    elif os.path.exists(full_dump_path):
+        os.remove(full_dump_path)
+
+    return metadata, files
+
+def load_ytdlp_full_dump(target_dir):
+    """압축 저장된 yt-dlp 원본 덤프를 읽습니다. 없으면 None."""
+    path = os.path.join(target_dir, YTDLP_FULL_DUMP_FILENAME)
+    if not os.path.exists(path):
+        return None
+    import zstandard
+
+    with open(path, 'rb') as f:
+        with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            return loads(reader.read())
+
+def load_json_if_exists(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        return read_json(path)
+    except (OSError, JSONDecodeError):
+        return {}
+
+def find_video_file(target_dir):
+    for f in os.listdir(target_dir):
+        if f.startswith("video") and f.endswith((".mp4", ".webm", ".mkv", ".mov", ".avi")):
+            return f
+    return None
+
+def collect_and_split_data(api_key, url, video_id, refresh=False, download_mode=None, download_profile=None,
+                           save_full_dump=None):
+    """
+    API 데이터와 yt-dlp 데이터를 각각 추출하여 개별 JSON으로 저장합니다.
+
+    폴더의 manifest.json에 단계별 완료 기록이 있으면 유효한 산출물은 재사용하고,
+    TTL이 지났거나 파일이 바뀐 단계만 다시 수집합니다. refresh=True면 모두 다시 수집합니다.
+    download_mode: "direct"(기본, 재인코딩 없이 remux) 또는 "transcode"(항상 libx264 재인코딩)
+    download_profile: "analysis"(기본, 분석용 저해상도 영상만) 또는 "full"(최고 화질 + 오디오)
+    save_full_dump: True면 yt-dlp 원본 덤프도 zstd 압축해 저장 (기본값: SAVE_FULL_YTDLP_DUMP)
+
+    Returns:
+    - {"storage_path": 폴더 경로, "api_data": API 원본 dict, "metadata": yt-dlp 요약 dict}
+      (호출 측에서 JSON 파일을 다시 읽지 않도록 메모리에 있는 값을 함께 돌려줌)
+    """
+    download_mode = download_mode or DOWNLOAD_MODE
+    download_profile = download_profile or DOWNLOAD_PROFILE
+    save_full_dump = SAVE_FULL_YTDLP_DUMP if save_full_dump is None else bool(save_full_dump)
+    download_options = {"mode": download_mode, "profile": download_profile, "full_dump": save_full_dump}
+    if download_profile == PROFILE_ANALYSIS:
+        download_options["min_short_side"] = MIN_SHORT_SIDE
     # [폴더 생성] 고유 ID 기반으로 저장 폴더 생성
     target_dir = os.path.join(os.getcwd(), f"Extraction_{video_id}")
     if not os.path.exists(target_dir):
         os.makedirs(target_dir)
 
+    manifest = ArtifactManifest(target_dir)
+    api_json_path = os.path.join(target_dir, "data_api_origin.json")
+    previous_api = {} if refresh else load_json_if_exists(api_json_path)
+
+    def reusable(stage, section=None):
+        if refresh:
+            return False
+        sections = {section: previous_api.get(section)} if section else None
+        return manifest.is_valid(stage, sections=sections)
+
     print(f"🚀 [데이터 전수 추출 시작] ID: {video_id}")
 
     # --- [1] YouTube API 데이터 수집 ---
     # 1-1. 영상 상세 정보 (Snippet, Statistics 등 모든 Part)
-    video_raw = youtube.videos().list(
-        part="snippet,statistics,contentDetails,status,topicDetails,recordingDetails,liveStreamingDetails,localizations,player",
-        id=video_id
-    ).execute()
+    def fetch_video_info():
+        if reusable("video_info", "video_info"):
+            print("♻️ 영상 정보 재사용")
+            return previous_api["video_info"]
+        video_raw = execute_request(get_youtube_client(api_key).videos().list(
+            part="snippet,statistics,contentDetails,status,topicDetails,recordingDetails,liveStreamingDetails,localizations,player",
+            id=video_id
+        ))
+        manifest.record("video_info", sections={"video_info": video_raw})
+        return video_raw
 
-    # 1-2. 댓글 정보 (최대 100개 원본)
-    try:
-        comments_raw = youtube.commentThreads().list(
-            part="snippet,replies",
-            videoId=video_id,
-            maxResults=100,
-            order="relevance"
-        ).execute()
-    except Exception as e:
-        comments_raw = {"error": f"댓글 수집 불가: {str(e)}"}
+    # 1-2. 댓글 정보 (페이지를 따라가며 comments.jsonl에 스트리밍 저장, 요약만 JSON에 기록)
+    def fetch_comments():
+        if reusable("comments", "comments"):
+            print("♻️ 댓글 재사용")
+            return previous_api["comments"]
+        try:
+            comments_summary = stream_comments(api_key, video_id, target_dir)
+            manifest.record("comments", files=[COMMENTS_FILENAME], sections={"comments": comments_summary})
+            return comments_summary
+        except Exception as e:
+            return {"error": f"댓글 수집 불가: {str(e)}"}
 
     # 1-3. 자막 목록 정보 (메타데이터)
-    try:
-        captions_raw = youtube.captions().list(
-            part="snippet",
-            videoId=video_id
-        ).execute()
-    except Exception as e:
-        captions_raw = {"error": f"자막 목록 수집 불가: {str(e)}"}
+    def fetch_captions():
+        if reusable("captions", "captions"):
+            print("♻️ 자막 목록 재사용")
+            return previous_api["captions"]
+        try:
+            captions_raw = execute_request(get_youtube_client(api_key).captions().list(
+                part="snippet",
+                videoId=video_id
+            ))
+            manifest.record("captions", sections={"captions": captions_raw})
+            return captions_raw
+        except Exception as e:
+            return {"error": f"자막 목록 수집 불가: {str(e)}"}
 
     # --- [2] yt-dlp 데이터 수집 및 영상 다운로드 ---
-    ydl_opts = {
-        'format': 'bv*+ba/best',
-        'outtmpl': os.path.join(target_dir, "video.%(ext)s"),
-        'merge_output_format': 'mp4',
-        'postprocessors': [
-            {
-             'key': 'FFmpegVideoConvertor',
-             'preferedformat': 'mp4',
-            }
-      ],
-      'postprocessor_args': [
-        '-c:v', 'libx264',
-        '-c:a', 'aac'
-      ],
-        'writethumbnail': True,
-        'quiet': True,
-        'noplaylist': True,
-    }
+    def download():
+        # 같은 모드/프로필로 받은 영상이 온전할 때만 재사용
+        if (not refresh and find_video_file(target_dir)
+                and manifest.is_valid("download", sections={"download_options": download_options})):
+            metadata = load_json_if_exists(os.path.join(target_dir, YTDLP_METADATA_FILENAME))
+            if metadata:
+                print("♻️ 영상/썸네일/yt-dlp 메타데이터 재사용 (다운로드 생략)")
+                return metadata
+
+        # 다른 프로필로 받았던 영상이 남아 있으면 새 파일과 섞이지 않도록 삭제
+        while find_video_file(target_dir):
+            os.remove(os.path.join(target_dir, find_video_file(target_dir)))
+
+        print(f"⬇️ 영상 다운로드 (프로필: {download_profile}, 모드: {download_mode})")
+        ydl_opts = build_ydl_opts(target_dir, download_mode, download_profile)
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ytdlp_raw_info = ydl.extract_info(url, download=True)
+            # 썸네일 파일명 정리 (확장자 무관하게 thumbnail.jpg로 변경)
+            for f in os.listdir(target_dir):
+                if f.endswith(('.webp', '.png', '.jpg')) and "video" not in f:
+                    try: 
+                        os.rename(os.path.join(target_dir, f), os.path.join(target_dir, "thumbnail.jpg"))
+                    except: 
+                        pass
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ytdlp_raw_info = ydl.extract_info(url, download=True)
-        # 썸네일 파일명 정리 (확장자 무관하게 thumbnail.jpg로 변경)
-        for f in os.listdir(target_dir):
-            if f.endswith(('.webp', '.png', '.jpg')) and "video" not in f:
-                try: 
-                    os.rename(os.path.join(target_dir, f), os.path.join(target_dir, "thumbnail.jpg"))
-                except: 
-                    pass
+        # 직접 디코딩이 안 되는 코덱일 때만 재인코딩
+        if download_mode == DOWNLOAD_DIRECT:
+            ensure_decodable(target_dir)
+
+        # 파일 2: yt-dlp 메타데이터 요약 (+ 선택 시 압축된 원본 덤프)
+        metadata, metadata_files = save_ytdlp_metadata(target_dir, ytdlp_raw_info, save_full_dump)
+        # 이전 방식의 비압축 원본 덤프는 더 이상 쓰지 않으므로 정리
+        legacy_dump = os.path.join(target_dir, "data_ytdlp_origin.json")
+        if os.path.exists(legacy_dump):
+            os.remove(legacy_dump)
+
+        manifest.record("download", files=[find_video_file(target_dir), "thumbnail.jpg", *metadata_files],
+                        sections={"download_options": download_options})
+        return metadata
+
+    # API 호출 3개와 다운로드를 동시에 실행 (다운로드가 가장 오래 걸리므로 먼저 시작)
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="collect") as pool:
+        download_future = pool.submit(download)
+        video_future = pool.submit(fetch_video_info)
+        comments_future = pool.submit(fetch_comments)
+        captions_future = pool.submit(fetch_captions)
+
+        video_raw = video_future.result()
+        comments_raw = comments_future.result()
+        captions_raw = captions_future.result()
+        metadata = download_future.result()
 
     # --- [3] 결과물 개별 JSON 파일로 저장 ---
-    # 파일 1: YouTube API 종합 원본
+    # 파일 1: YouTube API 종합 원본 (이전 분석 리포트 등 추가 필드는 유지)
     api_combined = {
+        **previous_api,
         "video_info": video_raw,
         "comments": comments_raw,
         "captions": captions_raw
     }
-    with open(os.path.join(target_dir, "data_api_origin.json"), 'w', encoding='utf-8') as f:
-        json.dump(api_combined, f, indent=4, ensure_ascii=False)
-
-    # 파일 2: yt-dlp 메타데이터 원본 (기술 스펙 등)
-    with open(os.path.join(target_dir, "data_ytdlp_origin.json"), 'w', encoding='utf-8') as f:
-        json.dump(ytdlp_raw_info, f, indent=4, ensure_ascii=False, default=str)
+    # 모든 섹션을 재사용했다면 내용이 같으므로 다시 쓰지 않음
+    if api_combined != previous_api:
+        write_json(api_json_path, api_combined, pretty=True)
 
-    return target_dir
+    return {"storage_path": target_dir, "api_data": api_combined, "metadata": metadata}
 
 def extract_shorts():
     api_key = get_or_save_api_key()
@@ -119,12 +513,12 @@ def extract_shorts():
     
     if v_id:
         try:
-            result_path = collect_and_split_data(api_key, url, v_id)
+            result_path = collect_and_split_data(api_key, url, v_id)["storage_path"]
             print("\n" + "="*70)
             print(f"✅ 모든 데이터 분리 저장 완료!")
             print(f"📂 폴더 위치: {result_path}")
             print(f"1️⃣ YouTube API 원본: data_api_origin.json")
-            print(f"2️⃣ yt-dlp 원본: data_ytdlp_origin.json")
+            print(f"2️⃣ yt-dlp 요약: {YTDLP_METADATA_FILENAME}")
             print(f"3️⃣ 멀티미디어: video.mp4 / thumbnail.jpg")
             print("="*70)
         except Exception as e: